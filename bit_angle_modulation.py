@@ -0,0 +1,123 @@
+from serial_to_parallel import SerialToParallel
+
+import machine
+
+# shortest time slot a timer callback plus a chain shift fits in on an ESP32 running MicroPython
+MIN_SLOT_US = 250
+
+
+class BitAngleModulation:
+
+    def __init__(self, serial_to_parallel: SerialToParallel, timer: machine.Timer, bits: int = 4,
+                 frame_rate: int = 100, min_slot_us: int = MIN_SLOT_US):
+        # bit plane k is latched for 2 ** k time slots, so a frame costs one shift per bit whatever the pin count.
+        # the shortest slot is 1 / (frame_rate * (2 ** bits - 1)), with 250 us slots that allows 4 bits at up to
+        # 266 Hz, 5 bits at 129 Hz, 6 bits at 63 Hz or 8 bits at 15 Hz
+        slot_frequency = frame_rate * ((1 << bits) - 1)
+        if bits < 1 or 1000000 // slot_frequency < min_slot_us:
+            raise ValueError('a ' + str(bits) + ' bit frame at ' + str(frame_rate) + ' Hz needs slots shorter than ' +
+                             str(min_slot_us) + ' us')
+        self.__serial_to_parallel = serial_to_parallel
+        self.__timer = timer
+        self.__bits = bits
+        ic_count = serial_to_parallel.ic_count
+        self.__planes = [bytearray(ic_count) for _ in range(bits)]
+        self.__mask = bytearray(ic_count)
+        self.__shadow = bytearray(ic_count)
+        self.__base = bytearray(ic_count)
+        self.__levels = bytearray(serial_to_parallel.pins_count)
+        self.__indexes = []
+        self.__changed = True
+        self.__plane_frequencies = [slot_frequency / (1 << plane) for plane in range(bits)]
+        self.__plane = 0
+        self.__running = False
+        self.__tick_ref = self.__tick
+        self.__take_frame_ref = self.__take_frame
+
+    @property
+    def bits(self) -> int:
+        return self.__bits
+
+    @property
+    def max_level(self) -> int:
+        return (1 << self.__bits) - 1
+
+    def brightness(self, index: int) -> int:
+        return self.__levels[index]
+
+    def set_brightness(self, index: int, level: int) -> None:
+        level = max(0, min(self.max_level, level))
+        if index not in self.__indexes:
+            self.__indexes.append(index)
+            self.__mask[index >> 3] |= 1 << (index & 7)
+        if self.__levels[index] != level:
+            self.__levels[index] = level
+            self.__changed = True
+
+    def set_levels(self, indexes: list, level: int) -> None:
+        for index in indexes:
+            self.set_brightness(index, level)
+
+    def release(self, index: int) -> None:
+        # hands the pin back to the plain shadow frame
+        if index in self.__indexes:
+            self.__indexes.remove(index)
+            self.__mask[index >> 3] &= ~(1 << (index & 7))
+            self.__levels[index] = 0
+            self.__changed = True
+
+    def start(self) -> None:
+        # the engine owns latching while it runs, ordinary commits only hand it the new shadow frame
+        self.__take_frame(self.__serial_to_parallel.frame)
+        self.__serial_to_parallel.set_output_owner(self.__take_frame_ref)
+        self.__running = True
+        self.__plane = 0
+        self.__tick(self.__timer)
+
+    def stop(self) -> None:
+        self.__running = False
+        self.__timer.deinit()
+        self.__serial_to_parallel.set_output_owner(None)
+        self.__serial_to_parallel.commit(force=True)
+
+    def __take_frame(self, frame: bytearray) -> None:
+        shadow = self.__shadow
+        for i in range(len(shadow)):
+            shadow[i] = frame[i]
+
+    def __tick(self, t) -> None:
+        if not self.__running:
+            return
+        plane = self.__plane
+        if plane == 0:
+            self.__rebuild()
+        self.__serial_to_parallel.show(self.__planes[plane])
+        self.__timer.init(freq=self.__plane_frequencies[plane], mode=machine.Timer.ONE_SHOT,
+                          callback=self.__tick_ref)
+        plane += 1
+        self.__plane = 0 if plane == self.__bits else plane
+
+    def __rebuild(self) -> None:
+        # the planes carry the committed shadow frame for every pin that is not modulated, so they only change when
+        # the levels or the rest of the frame changed
+        frame = self.__shadow
+        mask = self.__mask
+        base = self.__base
+        changed = self.__changed
+        for i in range(len(base)):
+            byte = frame[i] & ~mask[i]
+            if byte != base[i]:
+                base[i] = byte
+                changed = True
+        if not changed:
+            return
+        self.__changed = False
+        for plane in self.__planes:
+            for i in range(len(base)):
+                plane[i] = base[i]
+        for index in self.__indexes:
+            level = self.__levels[index]
+            bit = 1 << (index & 7)
+            for plane in range(self.__bits):
+                if (level >> plane) & 1:
+                    self.__planes[plane][index >> 3] |= bit
@@ -1,8 +1,179 @@
-from parallel_to_serial import ParallelToSerial
+from parallel_to_serial import ParallelToSerial, set_bits
+
+import array
+import time
 
 
 class Button:
 
-    def __init__(self, parallel_to_serial: ParallelToSerial, pin_index: int):
+    def __init__(self, parallel_to_serial: ParallelToSerial, pin_index: int, on_press=None, on_release=None,
+                 on_long_press=None, on_repeat=None):
         self.__parallel_to_serial = parallel_to_serial
         self.__pin_index = pin_index
+        self.on_press = on_press
+        self.on_release = on_release
+        self.on_long_press = on_long_press
+        self.on_repeat = on_repeat
+
+    @property
+    def pin(self) -> int:
+        return self.__pin_index
+
+    @property
+    def mask(self) -> int:
+        return 1 << self.__pin_index
+
+    def value(self) -> int:
+        return (self.__parallel_to_serial.state >> self.__pin_index) & 1
+
+
+class Keypad:
+
+    def __init__(self, parallel_to_serial: ParallelToSerial, long_press_ms: int = 800, repeat_delay_ms: int = 500,
+                 repeat_interval_ms: int = 100, chord_window_ms: int = 50):
+        self.__parallel_to_serial = parallel_to_serial
+        # handler table indexed by input bit, filled when buttons are added
+        self.__buttons = [None for _ in range(parallel_to_serial.pins_count)]
+        self.__mask = 0
+        # gesture state for the whole chain: held keys as a mask and press/repeat times indexed by input bit
+        self.__long_press_ms = long_press_ms
+        self.__repeat_delay_ms = repeat_delay_ms
+        self.__repeat_interval_ms = repeat_interval_ms
+        self.__held = 0
+        self.__timed = 0
+        self.__long_pressed = 0
+        self.__pressed_at = array.array('i', [0 for _ in range(parallel_to_serial.pins_count)])
+        self.__next_repeat = array.array('i', [0 for _ in range(parallel_to_serial.pins_count)])
+        # presses of chord members wait for chord_window_ms, or the release, before they fire on their own
+        self.__chord_window_ms = chord_window_ms
+        self.__chords = []
+        self.__chord_members = 0
+        self.__deferred = 0
+        self.__chorded = 0
+        self.__now = time.ticks_ms()
+        parallel_to_serial.subscribe(self.dispatch)
+
+    def add(self, button: Button, on_press=None, on_release=None, on_long_press=None, on_repeat=None) -> Button:
+        if on_press is not None:
+            button.on_press = on_press
+        if on_release is not None:
+            button.on_release = on_release
+        if on_long_press is not None:
+            button.on_long_press = on_long_press
+        if on_repeat is not None:
+            button.on_repeat = on_repeat
+        self.__buttons[button.pin] = button
+        self.__mask |= button.mask
+        if button.on_long_press is not None or button.on_repeat is not None:
+            self.__timed |= button.mask
+        return button
+
+    def register(self, pin_index: int, on_press=None, on_release=None, on_long_press=None,
+                 on_repeat=None) -> Button:
+        return self.add(Button(self.__parallel_to_serial, pin_index, on_press, on_release, on_long_press, on_repeat))
+
+    def remove(self, button: Button) -> None:
+        self.__buttons[button.pin] = None
+        self.__mask &= ~button.mask
+        self.__timed &= ~button.mask
+        self.__held &= ~button.mask
+        self.__deferred &= ~button.mask
+        self.__chorded &= ~button.mask
+
+    def add_chord(self, buttons: list, callback) -> None:
+        # callback(buttons) fires when exactly these buttons become held together. it replaces the presses of the
+        # members, which then stay silent until they are released
+        mask = 0
+        for button in buttons:
+            mask |= button.mask
+        self.__chords.append((mask, buttons, callback))
+        self.__chord_members |= mask
+
+    def set_timing(self, long_press_ms: int, repeat_delay_ms: int, repeat_interval_ms: int,
+                   chord_window_ms: int = None) -> None:
+        self.__long_press_ms = long_press_ms
+        self.__repeat_delay_ms = repeat_delay_ms
+        self.__repeat_interval_ms = repeat_interval_ms
+        if chord_window_ms is not None:
+            self.__chord_window_ms = chord_window_ms
+
+    @property
+    def held(self) -> int:
+        return self.__held
+
+    def poll(self) -> None:
+        self.__parallel_to_serial.poll()
+        self.update()
+
+    def update(self, now: int = None) -> None:
+        # fires long press and auto repeat of held keys, cost grows with the number of held keys
+        if now is None:
+            now = time.ticks_ms()
+        for index in set_bits(self.__held & (self.__timed | self.__deferred) & ~self.__chorded):
+            self.__update_held(index, now)
+
+    def __update_held(self, index: int, now: int) -> None:
+        button = self.__buttons[index]
+        if (self.__deferred >> index) & 1:
+            if time.ticks_diff(now, self.__pressed_at[index]) < self.__chord_window_ms:
+                return
+            # no chord came together in time, the key counts as pressed on its own
+            self.__deferred &= ~(1 << index)
+            if button.on_press is not None:
+                button.on_press(button)
+        if button.on_long_press is not None and not (self.__long_pressed >> index) & 1:
+            if time.ticks_diff(now, self.__pressed_at[index]) >= self.__long_press_ms:
+                self.__long_pressed |= 1 << index
+                button.on_long_press(button)
+        if button.on_repeat is not None and time.ticks_diff(now, self.__next_repeat[index]) >= 0:
+            self.__next_repeat[index] = time.ticks_add(now, self.__repeat_interval_ms)
+            button.on_repeat(button)
+
+    def button(self, pin_index: int) -> Button:
+        return self.__buttons[pin_index]
+
+    @property
+    def mask(self) -> int:
+        return self.__mask
+
+    def dispatch(self, rising: int, falling: int) -> None:
+        self.__now = time.ticks_ms()
+        rising &= self.__mask
+        falling &= self.__mask
+        previous = self.__held
+        self.__held = (previous | rising) & ~falling
+        self.__long_pressed &= ~falling
+        if rising:
+            for mask, buttons, callback in self.__chords:
+                if self.__held == mask and previous != mask:
+                    self.__deferred &= ~mask
+                    self.__chorded |= mask
+                    rising &= ~mask
+                    callback(buttons)
+            self.__deferred |= rising & self.__chord_members
+            self.__dispatch(rising, True)
+        if falling:
+            # a chord member released within the window is a plain tap, released chord members stay silent
+            tapped = falling & self.__deferred
+            self.__deferred &= ~falling
+            for index in set_bits(tapped):
+                button = self.__buttons[index]
+                if button.on_press is not None:
+                    button.on_press(button)
+            chorded = falling & self.__chorded
+            self.__chorded &= ~falling
+            self.__dispatch(falling & ~chorded, False)
+
+    def __dispatch(self, mask: int, pressed: bool) -> None:
+        buttons = self.__buttons
+        deferred = self.__deferred
+        for index in set_bits(mask):
+            button = buttons[index]
+            if pressed:
+                self.__pressed_at[index] = self.__now
+                self.__next_repeat[index] = time.ticks_add(self.__now, self.__repeat_delay_ms)
+                if (deferred >> index) & 1:
+                    continue
+            callback = button.on_press if pressed else button.on_release
+            if callback is not None:
+                callback(button)
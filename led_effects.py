@@ -0,0 +1,136 @@
+from serial_to_parallel import SerialToParallel
+from bit_angle_modulation import BitAngleModulation
+from tick_scheduler import TickScheduler
+from led import Led
+
+
+class LedEffect:
+
+    def __init__(self, pin_index: int, segments: list, repeats: int = 0, modulated: bool = False):
+        # segments is a list of (value, duration_ms), repeats 0 runs until stopped
+        self.__pin_index = pin_index
+        self.__segments = segments
+        self.__segment = 0
+        self.__remaining = segments[0][1]
+        self.__repeats = repeats
+        self.__modulated = modulated
+        self.__finished = False
+
+    @property
+    def pin(self) -> int:
+        return self.__pin_index
+
+    @property
+    def modulated(self) -> bool:
+        return self.__modulated
+
+    @property
+    def value(self) -> int:
+        return self.__segments[self.__segment][0]
+
+    @property
+    def finished(self) -> bool:
+        return self.__finished
+
+    def advance(self, elapsed_ms: int) -> bool:
+        # returns True when the effect moved to another segment or finished
+        self.__remaining -= elapsed_ms
+        if self.__remaining > 0:
+            return False
+        segments = self.__segments
+        segment = self.__segment + 1
+        if segment == len(segments):
+            segment = 0
+            if self.__repeats:
+                self.__repeats -= 1
+                if self.__repeats == 0:
+                    self.__finished = True
+                    return True
+        self.__segment = segment
+        self.__remaining += segments[segment][1]
+        return True
+
+
+class EffectScheduler:
+
+    def __init__(self, serial_to_parallel: SerialToParallel, scheduler: TickScheduler,
+                 modulation: BitAngleModulation = None):
+        # every effect runs on the shared scheduler tick and all pin changes of a tick are latched by a single commit
+        self.__serial_to_parallel = serial_to_parallel
+        self.__scheduler = scheduler
+        self.__modulation = modulation
+        self.__effects = []
+
+    def pattern(self, led: Led, segments: list, repeats: int = 0, modulated: bool = False) -> None:
+        # modulated values are brightness levels of the BitAngleModulation engine instead of on/off
+        if modulated and self.__modulation is None:
+            raise ValueError('modulated effects need a BitAngleModulation engine')
+        self.stop(led, commit=False)
+        effect = LedEffect(led.pin, segments, repeats, modulated)
+        self.__effects.append(effect)
+        self.__apply(effect, effect.value)
+        self.__serial_to_parallel.commit()
+        self.__scheduler.add(self)
+
+    def blink(self, led: Led, on_ms: int, off_ms: int, count: int = 0) -> None:
+        self.pattern(led, [(1, on_ms), (0, off_ms)], count)
+
+    def pulse(self, led: Led, period_ms: int, width_ms: int, count: int = 0) -> None:
+        self.pattern(led, [(1, width_ms), (0, period_ms - width_ms)], count)
+
+    def one_shot(self, led: Led, duration_ms: int) -> None:
+        self.pattern(led, [(1, duration_ms)], 1)
+
+    def breathe(self, led: Led, period_ms: int, count: int = 0) -> None:
+        if self.__modulation is None:
+            raise ValueError('breathing needs a BitAngleModulation engine')
+        top = self.__modulation.max_level
+        step_ms = max(self.__scheduler.tick_ms, period_ms // (2 * top))
+        levels = list(range(top + 1)) + list(range(top - 1, 0, -1))
+        self.pattern(led, [(level, step_ms) for level in levels], count, modulated=True)
+
+    def stop(self, led: Led, commit=True) -> None:
+        for effect in self.__effects:
+            if effect.pin == led.pin:
+                self.__effects.remove(effect)
+                self.__apply(effect, 0)
+                break
+        if commit:
+            self.__serial_to_parallel.commit()
+        if not self.__effects:
+            self.__scheduler.remove(self)
+
+    def stop_all(self) -> None:
+        for effect in self.__effects:
+            self.__apply(effect, 0)
+        self.__effects = []
+        self.__serial_to_parallel.commit()
+        self.__scheduler.remove(self)
+
+    @property
+    def effects_count(self) -> int:
+        return len(self.__effects)
+
+    def __apply(self, effect: LedEffect, value: int) -> None:
+        if effect.modulated:
+            self.__modulation.set_brightness(effect.pin, value)
+        else:
+            self.__serial_to_parallel.set_pin(effect.pin, value, commit=False)
+
+    def step(self, elapsed_ms: int) -> bool:
+        finished = None
+        for effect in self.__effects:
+            if not effect.advance(elapsed_ms):
+                continue
+            if effect.finished:
+                if finished is None:
+                    finished = []
+                finished.append(effect)
+            else:
+                self.__apply(effect, effect.value)
+        if finished is not None:
+            for effect in finished:
+                self.__effects.remove(effect)
+                self.__apply(effect, 0)
+        self.__serial_to_parallel.commit()
+        return len(self.__effects) > 0
@@ -1,22 +1,27 @@
 from serial_to_parallel import SerialToParallel
 from led import Led
-
-import machine
+from pwm_pool import PwmPool
 
 
 class LedPwm(Led):
 
     def __init__(self, serial_to_parallel: SerialToParallel, pin_index: int, pwm_pin: int, init_value: int = 0,
-                 pwm_duty: int = 0, pwm_frequency: int = 1000):
+                 pwm_duty: int = 0, pwm_frequency: int = 1000, pwm_pool: PwmPool = None):
+        # the channel is allocated first, so running out of channels leaves the chain output untouched
+        self.__pwm_pool = pwm_pool if pwm_pool is not None else PwmPool.default()
+        self.__pwm_pin = pwm_pin
+        self.__pwm = self.__pwm_pool.allocate(pwm_pin, pwm_frequency, pwm_duty)
         super().__init__(serial_to_parallel, pin_index, init_value)
-        self.__pwm_pin = machine.Pin(pwm_pin, mode=machine.Pin.OUT)
-        self.__pwm_pin.off()
-        self.__pwm = machine.PWM(self.__pwm_pin)
-        self.__pwm.freq(pwm_frequency)
-        self.__pwm.duty(pwm_duty)
+
+    @property
+    def pwm_pin(self) -> int:
+        return self.__pwm_pin
 
     def set_light_density(self, pwm_duty: int) -> None:
         self.__pwm.duty(pwm_duty)
 
     def set_pwm_frequency(self, pwm_frequency: int) -> None:
-        self.__pwm.freq(pwm_frequency)
+        self.__pwm_pool.set_frequency([self.__pwm_pin], pwm_frequency)
+
+    def release(self) -> None:
+        self.__pwm_pool.release(self.__pwm_pin)
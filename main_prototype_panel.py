@@ -4,39 +4,34 @@ from seven_segment import SevenSegment
 from multi_seven_segment import MultiSevenSegment
 from machine import Timer
 from parallel_to_serial import ParallelToSerial
-from button import Button
+from button import Button, Keypad
+from prototype_panel_board import OUTPUTS, IC595_COUNT, IC165_COUNT
 
-ic595 = 8
-ic165 = 3
+ic595 = IC595_COUNT
+ic165 = IC165_COUNT
 
 stp = SerialToParallel(serial=5, storage_register_clock=16, register_clock=15, ic_count=8,
                        init_values=[0 for _ in range(ic595 * 8)])
-red_progress = ProgressLedPwm(serial_to_parallel=stp, indexes=[30, 31, 0, 1, 2, 3, 4, 5, 6, 7], pwm_pin=14,
+red_progress = ProgressLedPwm(serial_to_parallel=stp, indexes=OUTPUTS.indexes('red_progress'), pwm_pin=14,
                               init_light_density=5*102)
 red_progress.set_value(5)
-green_progress = ProgressLedPwm(serial_to_parallel=stp, indexes=[24, 25, 26, 27, 28, 29, 8, 9, 10, 11], pwm_pin=12,
+green_progress = ProgressLedPwm(serial_to_parallel=stp, indexes=OUTPUTS.indexes('green_progress'), pwm_pin=12,
                                 init_light_density=5*102)
 green_progress.set_value(5)
-blue_progress = ProgressLedPwm(serial_to_parallel=stp, indexes=[22, 21, 20, 19, 18, 17, 15, 14, 13, 12], pwm_pin=13,
+blue_progress = ProgressLedPwm(serial_to_parallel=stp, indexes=OUTPUTS.indexes('blue_progress'), pwm_pin=13,
                                init_light_density=5*102)
 blue_progress.set_value(5)
 
-digit1 = SevenSegment(serial_to_parallel=stp, a_pin_index=32, b_pin_index=33, c_pin_index=38, d_pin_index=37,
-                      e_pin_index=36, f_pin_index=34, g_pin_index=35, dot_pin_index=39)
-digit2 = SevenSegment(serial_to_parallel=stp, a_pin_index=40, b_pin_index=41, c_pin_index=46, d_pin_index=45,
-                      e_pin_index=44, f_pin_index=42, g_pin_index=43, dot_pin_index=47)
-digit3 = SevenSegment(serial_to_parallel=stp, a_pin_index=48, b_pin_index=49, c_pin_index=54, d_pin_index=53,
-                      e_pin_index=52, f_pin_index=50, g_pin_index=51, dot_pin_index=55)
-digit4 = SevenSegment(serial_to_parallel=stp, a_pin_index=56, b_pin_index=57, c_pin_index=62, d_pin_index=61,
-                      e_pin_index=60, f_pin_index=58, g_pin_index=59, dot_pin_index=63)
+digit1 = SevenSegment(stp, *OUTPUTS.indexes('digit1'))
+digit2 = SevenSegment(stp, *OUTPUTS.indexes('digit2'))
+digit3 = SevenSegment(stp, *OUTPUTS.indexes('digit3'))
+digit4 = SevenSegment(stp, *OUTPUTS.indexes('digit4'))
 digits = MultiSevenSegment([digit1, digit2, digit3, digit4])
 pts = ParallelToSerial(shift=2, serial=4, clock=0, ic_count=ic165)
 
-last_key = None
-
 timer = Timer(-1)
 
-btn = 18
+keypad = Keypad(pts, repeat_delay_ms=500, repeat_interval_ms=200)
 
 btn1 = Button(parallel_to_serial=pts, pin_index=4)
 btn2 = Button(parallel_to_serial=pts, pin_index=3)
@@ -58,51 +53,50 @@ btn_bp = Button(parallel_to_serial=pts, pin_index=19)
 btn_bm = Button(parallel_to_serial=pts, pin_index=9)
 
 
-def on_key_touched(t):
-    global last_key
-    values = pts.values
-    for i in range(ic165*8):
-        if values[i] == 1:
-            if i == btn1.pin:
-                digits.set_value((digits.value * 10) + 1)
-            elif i == btn2.pin:
-                digits.set_value((digits.value * 10) + 2)
-            elif i == btn3.pin:
-                digits.set_value((digits.value * 10) + 3)
-            elif i == btn4.pin:
-                digits.set_value((digits.value * 10) + 4)
-            elif i == btn5.pin:
-                digits.set_value((digits.value * 10) + 5)
-            elif i == btn6.pin:
-                digits.set_value((digits.value * 10) + 6)
-            elif i == btn7.pin:
-                digits.set_value((digits.value * 10) + 7)
-            elif i == btn8.pin:
-                digits.set_value((digits.value * 10) + 8)
-            elif i == btn9.pin:
-                digits.set_value((digits.value * 10) + 9)
-            elif i == btn0.pin:
-                digits.set_value((digits.value * 10) + 0)
-            elif i == btn_clean.pin:
-                digits.off()
-            elif i == btn_rm.pin:
-                red_progress.decrease()
-                red_progress.set_light_density(red_progress.value*102)
-            elif i == btn_rp.pin:
-                red_progress.increase()
-                red_progress.set_light_density(red_progress.value * 102)
-            elif i == btn_gm.pin:
-                green_progress.decrease()
-                green_progress.set_light_density(green_progress.value * 102)
-            elif i == btn_gp.pin:
-                green_progress.increase()
-                green_progress.set_light_density(green_progress.value * 102)
-            elif i == btn_bm.pin:
-                blue_progress.decrease()
-                blue_progress.set_light_density(blue_progress.value * 102)
-            elif i == btn_bp.pin:
-                blue_progress.increase()
-                blue_progress.set_light_density(blue_progress.value * 102)
-
-
-timer.init(period=100, mode=Timer.PERIODIC, callback=on_key_touched)
+def append_digit(digit):
+    value = digits.last if isinstance(digits.last, int) else 0
+    value = (value * 10) + digit
+    # a full display ignores further digits
+    if value < 10 ** len(digits.seven_segments):
+        digits.set_value(value)
+
+
+def clean(button):
+    digits.off()
+    digits.set_value(0, commit=False)
+
+
+def change_progress(progress, increase):
+    if increase:
+        progress.increase()
+    else:
+        progress.decrease()
+    progress.set_light_density(progress.value * 102)
+
+
+for digit, button in enumerate([btn0, btn1, btn2, btn3, btn4, btn5, btn6, btn7, btn8, btn9]):
+    keypad.add(button, on_press=lambda b, d=digit: append_digit(d))
+keypad.add(btn_clean, on_press=clean)
+keypad.add(btn_rm, on_press=lambda b: change_progress(red_progress, False),
+           on_repeat=lambda b: change_progress(red_progress, False))
+keypad.add(btn_rp, on_press=lambda b: change_progress(red_progress, True),
+           on_repeat=lambda b: change_progress(red_progress, True))
+keypad.add(btn_gm, on_press=lambda b: change_progress(green_progress, False),
+           on_repeat=lambda b: change_progress(green_progress, False))
+keypad.add(btn_gp, on_press=lambda b: change_progress(green_progress, True),
+           on_repeat=lambda b: change_progress(green_progress, True))
+keypad.add(btn_bm, on_press=lambda b: change_progress(blue_progress, False),
+           on_repeat=lambda b: change_progress(blue_progress, False))
+keypad.add(btn_bp, on_press=lambda b: change_progress(blue_progress, True),
+           on_repeat=lambda b: change_progress(blue_progress, True))
+
+
+def on_key_touched():
+    with stp.batch():
+        keypad.poll()
+
+
+# 10 ms scans while keys are in use, back to 100 ms after two idle seconds. a key has to read the same for 20 ms
+# before it counts, so contact bounce does not turn into extra presses
+pts.set_debounce_time(20, 10)
+pts.start_adaptive_scan(timer, fast_period_ms=10, slow_period_ms=100, active_window_ms=2000, poll=on_key_touched)
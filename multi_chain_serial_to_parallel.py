@@ -0,0 +1,136 @@
+from serial_to_parallel import SerialToParallel, SELF_TEST_PATTERN
+from shift_timing import ShiftTiming
+from pwm_pool import PwmPool
+
+import machine
+import os
+import sys
+import time
+
+ESP32_GPIO_OUT_W1TS_REG = 0x3FF44008
+ESP32_GPIO_OUT_W1TC_REG = 0x3FF4400C
+
+
+def _classic_esp32() -> bool:
+    # the registers above are the original ESP32's, sys.platform is also 'esp32' on the S2, S3 and C3 whose GPIO
+    # registers live elsewhere. their uname ends with the chip name, such as 'with ESP32S3'
+    return sys.platform == 'esp32' and os.uname().machine.endswith('with ESP32')
+
+
+class MultiChainSerialToParallel(SerialToParallel):
+
+    def __init__(self, serials: list, storage_register_clock: int, register_clock: int, ic_count_per_chain: int = 1,
+                 init_values: list = None, timing: ShiftTiming = None, output_enable: int = None,
+                 brightness: int = 1023, brightness_frequency: int = 1000, pwm_pool: PwmPool = None):
+        self.__serials = [machine.Pin(serial, mode=machine.Pin.OUT, value=0) for serial in serials]
+        self.__clock = machine.Pin(register_clock, mode=machine.Pin.OUT, value=0)
+        self.__chain_count = len(serials)
+        self.__chain_ic_count = ic_count_per_chain
+        # on the original ESP32 all data lines and the shift clock are driven through the set/clear registers when
+        # they are GPIO0-31
+        self.__use_registers = _classic_esp32() and max(serials) < 32 and register_clock < 32
+        self.__data_bits = [1 << serial for serial in serials]
+        self.__data_mask = 0
+        for bit in self.__data_bits:
+            self.__data_mask |= bit
+        self.__clock_bit = 1 << register_clock
+        super().__init__(serials[0], storage_register_clock, register_clock,
+                         ic_count=len(serials) * ic_count_per_chain, init_values=init_values, timing=timing,
+                         output_enable=output_enable, brightness=brightness,
+                         brightness_frequency=brightness_frequency, pwm_pool=pwm_pool)
+
+    @property
+    def chain_count(self) -> int:
+        return self.__chain_count
+
+    @property
+    def chain_ic_count(self) -> int:
+        return self.__chain_ic_count
+
+    def chain_of(self, index: int) -> int:
+        return index // (self.__chain_ic_count * 8)
+
+    def self_test(self, loopback_pins: list = None, profiles: list = None):
+        # needs Q7' of the last 74HC595 of every chain wired back to loopback_pins, in the order of the data lines.
+        # test patterns are shifted in without latching, so the outputs keep their current state.
+        if loopback_pins is None or len(loopback_pins) != self.__chain_count:
+            raise ValueError('the multi-chain self test needs one loopback pin per data line')
+        loopbacks = [machine.Pin(pin, mode=machine.Pin.IN) for pin in loopback_pins]
+        if profiles is None:
+            profiles = ShiftTiming.profiles()
+        previous = self.timing
+        chosen = None
+        for timing in profiles:
+            self.set_timing(timing)
+            if self.__loopback_passes(loopbacks):
+                chosen = timing
+                break
+        self.set_timing(previous if chosen is None else chosen)
+        self.commit(force=True)
+        return chosen
+
+    def __loopback_passes(self, loopbacks: list) -> bool:
+        length = self.ic_count
+        expected = bytearray(length)
+        inverted = bytearray(length)
+        readback = bytearray(length)
+        for i in range(length):
+            expected[i] = SELF_TEST_PATTERN[i % len(SELF_TEST_PATTERN)]
+            inverted[i] = ~expected[i] & 0xFF
+        self.__shift_pins(expected)
+        for sent, check in ((inverted, expected), (expected, inverted)):
+            for i in range(length):
+                readback[i] = 0
+            self.__shift_pins(sent, loopbacks, readback)
+            if readback != check:
+                return False
+        return True
+
+    def _shift_out(self, frame: bytearray) -> None:
+        if self.__use_registers:
+            self.__shift_registers(frame)
+        else:
+            self.__shift_pins(frame)
+
+    def __shift_registers(self, frame: bytearray) -> None:
+        clock_us = self.timing.clock_us
+        mem32 = machine.mem32
+        data_bits = self.__data_bits
+        data_mask = self.__data_mask
+        clock_bit = self.__clock_bit
+        chain_ic_count = self.__chain_ic_count
+        for byte in range(chain_ic_count):
+            for bit in range(8):
+                high = 0
+                offset = byte
+                for chain in range(self.__chain_count):
+                    if (frame[offset] >> bit) & 1:
+                        high |= data_bits[chain]
+                    offset += chain_ic_count
+                mem32[ESP32_GPIO_OUT_W1TC_REG] = (data_mask & ~high) | clock_bit
+                mem32[ESP32_GPIO_OUT_W1TS_REG] = high
+                if clock_us:
+                    time.sleep_us(clock_us)
+                mem32[ESP32_GPIO_OUT_W1TS_REG] = clock_bit
+                if clock_us:
+                    time.sleep_us(clock_us)
+        mem32[ESP32_GPIO_OUT_W1TC_REG] = clock_bit
+
+    def __shift_pins(self, frame: bytearray, loopbacks: list = None, readback: bytearray = None) -> None:
+        clock_us = self.timing.clock_us
+        serials = self.__serials
+        chain_ic_count = self.__chain_ic_count
+        for byte in range(chain_ic_count):
+            for bit in range(8):
+                offset = byte
+                for chain in range(self.__chain_count):
+                    serials[chain].value((frame[offset] >> bit) & 1)
+                    if loopbacks is not None and loopbacks[chain].value():
+                        readback[offset] |= 1 << bit
+                    offset += chain_ic_count
+                if clock_us:
+                    time.sleep_us(clock_us)
+                self.__clock.on()
+                if clock_us:
+                    time.sleep_us(clock_us)
+                self.__clock.off()
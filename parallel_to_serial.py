@@ -1,15 +1,45 @@
+from shift_timing import ShiftTiming
+
+import array
 import machine
+import micropython
 import time
 
+EDGE_FALLING = 0
+EDGE_RISING = 1
+
+
+def set_bits(mask: int):
+    # yields the index of every set bit of a chain mask, skipping empty bytes so sparse masks stay cheap
+    index = 0
+    while mask:
+        byte = mask & 0xFF
+        if byte:
+            for bit in range(8):
+                if (byte >> bit) & 1:
+                    yield index + bit
+        mask >>= 8
+        index += 8
+
 
 class ParallelToSerial:
 
     def __init__(self, shift: int, serial: int, clock: int, ic_count: int = 1, interrupt_pin: int = None,
                  interrupt_trigger: int = machine.Pin.IRQ_RISING,
-                 interrupt_handler: Callable[[machine.Pin], Any] = None):
+                 interrupt_handler: Callable[[machine.Pin], Any] = None, timing: ShiftTiming = None,
+                 spi: machine.SPI = None, event_buffer_size: int = 0):
         self.__shift = machine.Pin(shift, mode=machine.Pin.OUT, value=1)
-        self.__serial = machine.Pin(serial, mode=machine.Pin.IN)
-        self.__clock = machine.Pin(clock, mode=machine.Pin.OUT, value=1)
+        self.__spi = spi
+        if spi is None:
+            self.__serial = machine.Pin(serial, mode=machine.Pin.IN)
+            self.__clock = machine.Pin(clock, mode=machine.Pin.OUT, value=1)
+        else:
+            # serial and clock are the MISO and SCK pins of the given SPI bus. idle high and sampling on the
+            # falling edge matches the 74HC165, which shifts on the rising edge
+            self.__spi.init(polarity=1, phase=0, firstbit=machine.SPI.LSB)
+        self.__interrupt_trigger = interrupt_trigger
+        self.__interrupt_handler = interrupt_handler
+        self.__scan_trigger = interrupt_trigger
         if interrupt_pin is not None:
             self.__interrupt = machine.Pin(interrupt_pin, mode=machine.Pin.IN)
             if interrupt_handler is not None:
@@ -19,26 +49,377 @@ class ParallelToSerial:
         self.__ic_count = ic_count
         self.__pins = ic_count * 8
         self.__values = [0 for _ in range(ic_count * 8)]
+        self.__frame = bytearray(ic_count)
+        self.__state = 0
+        self.__rising = 0
+        self.__falling = 0
+        self.__debounce_samples = 1
+        self.__counters = []
+        self.__subscribers = []
+        self.__follow_up_timer = None
+        self.__follow_up_ms = 0
+        self.__interrupt_scan = False
+        # bound once so the hard IRQ handler does not allocate
+        self.__scheduled_poll_ref = self.__scheduled_poll
+        self.__adaptive_timer = None
+        self.__adaptive_poll = None
+        self.__scan_period_ms = 0
+        self.__fast_period_ms = 0
+        self.__slow_period_ms = 0
+        self.__active_window_ms = 0
+        self.__wake_on_interrupt = False
+        self.__last_activity = 0
+        self.__wake_ref = self.__wake
+        # event ring buffer, one extra slot is kept free to tell a full buffer from an empty one
+        slots = event_buffer_size + 1 if event_buffer_size > 0 else 0
+        self.__event_pins = bytearray(slots)
+        self.__event_edges = bytearray(slots)
+        self.__event_ticks = array.array('I', [0 for _ in range(slots)])
+        self.__event_head = 0
+        self.__event_tail = 0
+        self.__dropped_events = 0
+        self.__timing = None
+        self.set_timing(ShiftTiming.datasheet() if timing is None else timing)
 
-    @property
-    def values(self) -> list:
-        t.sleep_ms(1)
+    def load(self) -> None:
+        latch_us = self.__timing.latch_us
         self.__shift.value(0)
-        t.sleep_ms(1)
+        if latch_us:
+            time.sleep_us(latch_us)
         self.__shift.value(1)
-        t.sleep_ms(1)
+        if latch_us:
+            time.sleep_us(latch_us)
+
+    def scan(self) -> bytearray:
+        self.load()
+        if self.__spi is None:
+            self.__scan_bit_bang()
+        else:
+            self.__spi.readinto(self.__frame)
+        return self.__frame
+
+    def __scan_bit_bang(self) -> None:
+        clock_us = self.__timing.clock_us
+        frame = self.__frame
+        for i in range(len(frame)):
+            byte = 0
+            for bit in range(8):
+                if self.__serial.value():
+                    byte |= 1 << bit
+                self.__clock.value(0)
+                if clock_us:
+                    time.sleep_us(clock_us)
+                self.__clock.value(1)
+                if clock_us:
+                    time.sleep_us(clock_us)
+            frame[i] = byte
+
+    def read(self) -> int:
+        self.scan()
+        return self.__process()
+
+    def __process(self) -> int:
+        sample = int.from_bytes(self.__frame, 'little')
+        if self.__debounce_samples > 1:
+            sample = self.__debounce(sample)
+        self.__update(sample)
+        return self.__state
+
+    def set_debounce(self, samples: int) -> None:
+        # an input has to differ from the debounced state for this many scans in a row before it changes
+        self.__debounce_samples = max(1, samples)
+        width = 0
+        while (1 << width) <= self.__debounce_samples:
+            width += 1
+        self.__counters = [0 for _ in range(width)]
+
+    def set_debounce_time(self, stable_ms: int, scan_period_ms: int) -> None:
+        self.set_debounce((stable_ms + scan_period_ms - 1) // scan_period_ms)
+
+    @property
+    def debounce_samples(self) -> int:
+        return self.__debounce_samples
+
+    def __debounce(self, sample: int) -> int:
+        # vertical counters: counters[j] holds bit j of a per-input count of consecutive disagreeing scans
+        counters = self.__counters
+        samples = self.__debounce_samples
+        delta = sample ^ self.__state
+        carry = delta
+        reached = delta
+        for j in range(len(counters)):
+            counter = counters[j] & delta
+            counters[j] = counter ^ carry
+            carry = counter & carry
+            if (samples >> j) & 1:
+                reached &= counters[j]
+            else:
+                reached &= ~counters[j]
+        if reached:
+            for j in range(len(counters)):
+                counters[j] &= ~reached
+        return self.__state ^ reached
+
+    def __update(self, sample: int) -> None:
+        previous = self.__state
+        self.__state = sample
+        self.__rising = sample & ~previous
+        self.__falling = previous & ~sample
+        if len(self.__event_pins) and sample != previous:
+            self.__record_events(sample ^ previous, sample, time.ticks_us())
+
+    def __record_events(self, changed: int, sample: int, ticks: int) -> None:
+        # walks the bytes inline instead of using set_bits, a generator would allocate on every scan
+        index = 0
+        while changed:
+            byte = changed & 0xFF
+            if byte:
+                for bit in range(8):
+                    if (byte >> bit) & 1:
+                        self.__push_event(index + bit, (sample >> (index + bit)) & 1, ticks)
+            changed >>= 8
+            index += 8
+
+    def __push_event(self, index: int, edge: int, ticks: int) -> None:
+        head = self.__event_head
+        following = head + 1
+        if following == len(self.__event_pins):
+            following = 0
+        if following == self.__event_tail:
+            self.__dropped_events += 1
+            return
+        self.__event_pins[head] = index
+        self.__event_edges[head] = edge
+        self.__event_ticks[head] = ticks
+        self.__event_head = following
+
+    @property
+    def events_pending(self) -> int:
+        pending = self.__event_head - self.__event_tail
+        if pending < 0:
+            pending += len(self.__event_pins)
+        return pending
+
+    @property
+    def dropped_events(self) -> int:
+        return self.__dropped_events
+
+    def read_event(self):
+        # returns (pin index, EDGE_RISING or EDGE_FALLING, ticks_us) of the oldest event, or None
+        tail = self.__event_tail
+        if tail == self.__event_head:
+            return None
+        event = (self.__event_pins[tail], self.__event_edges[tail], self.__event_ticks[tail])
+        self.__advance_event_tail()
+        return event
+
+    def drain_events(self, callback) -> int:
+        # calls callback(pin index, edge, ticks_us) for every pending event, without building tuples
+        count = 0
+        while self.__event_tail != self.__event_head:
+            tail = self.__event_tail
+            callback(self.__event_pins[tail], self.__event_edges[tail], self.__event_ticks[tail])
+            self.__advance_event_tail()
+            count += 1
+        return count
+
+    def __advance_event_tail(self) -> None:
+        tail = self.__event_tail + 1
+        if tail == len(self.__event_pins):
+            tail = 0
+        self.__event_tail = tail
+
+    async def next_event(self, poll_ms: int = 5):
+        import uasyncio
+        while self.__event_tail == self.__event_head:
+            await uasyncio.sleep_ms(poll_ms)
+        return self.read_event()
+
+    def subscribe(self, callback) -> None:
+        # callback(rising, falling) is called with the edge masks of every poll that changed something
+        self.__subscribers.append(callback)
+
+    def unsubscribe(self, callback) -> None:
+        if callback in self.__subscribers:
+            self.__subscribers.remove(callback)
+
+    def poll(self) -> int:
+        self.read()
+        return self.__notify()
+
+    def feed(self, data: bytearray) -> int:
+        # like poll(), for inputs that were already loaded and shifted in by a shared bus
+        frame = self.__frame
+        for i in range(len(frame)):
+            frame[i] = data[i]
+        self.__process()
+        return self.__notify()
+
+    def __notify(self) -> int:
+        changed = self.__rising | self.__falling
+        if changed:
+            for callback in self.__subscribers:
+                callback(self.__rising, self.__falling)
+        return changed
+
+    def start_interrupt_scan(self, timer: machine.Timer, follow_up_ms: int = 10, trigger: int = None) -> None:
+        # the interrupt pin is the wired OR of all inputs, so it only shows the first press. while any input is
+        # active or still bouncing, follow up scans run every follow_up_ms on the timer until the chain is idle
+        if self.__interrupt is None:
+            raise ValueError('interrupt scanning needs an interrupt pin')
+        self.__follow_up_timer = timer
+        self.__follow_up_ms = follow_up_ms
+        self.__scan_trigger = self.__interrupt_trigger if trigger is None else trigger
+        self.__interrupt_scan = True
+        self.__install_interrupt()
+        self.__request_poll()
+
+    def stop_interrupt_scan(self) -> None:
+        self.__interrupt_scan = False
+        if self.__interrupt is not None:
+            self.__install_interrupt()
+        if self.__follow_up_timer is not None:
+            self.__follow_up_timer.deinit()
+
+    def __install_interrupt(self) -> None:
+        # one handler serves interrupt scanning and the adaptive scan wake up, the handler given to the constructor
+        # keeps being called meanwhile and is restored when neither is running
+        if self.__interrupt_scan or self.__wake_on_interrupt:
+            trigger = self.__scan_trigger if self.__interrupt_scan else self.__interrupt_trigger
+            self.__interrupt.irq(trigger=trigger, handler=self.__on_interrupt)
+        else:
+            self.__interrupt.irq(trigger=self.__interrupt_trigger, handler=self.__interrupt_handler)
+
+    def __on_interrupt(self, pin: machine.Pin) -> None:
+        if self.__interrupt_scan:
+            self.__request_poll()
+        if self.__wake_on_interrupt:
+            try:
+                micropython.schedule(self.__wake_ref, 0)
+            except RuntimeError:
+                pass
+        if self.__interrupt_handler is not None:
+            self.__interrupt_handler(pin)
+
+    def __request_poll(self) -> None:
+        try:
+            micropython.schedule(self.__scheduled_poll_ref, 0)
+        except RuntimeError:
+            # schedule queue is full, the follow up timer or the next edge scans again
+            pass
+
+    def __scheduled_poll(self, _) -> None:
+        if not self.__interrupt_scan:
+            return
+        self.poll()
+        if self.__state or self.__bouncing():
+            self.__follow_up_timer.init(period=self.__follow_up_ms, mode=machine.Timer.ONE_SHOT,
+                                        callback=lambda t: self.__request_poll())
+
+    def start_adaptive_scan(self, timer: machine.Timer, fast_period_ms: int = 1, slow_period_ms: int = 100,
+                            active_window_ms: int = 2000, wake_on_interrupt: bool = False, poll=None) -> None:
+        # scans every fast_period_ms while inputs are active and for active_window_ms after the last activity,
+        # then every slow_period_ms, or not at all until the interrupt pin wakes the scanner
+        if wake_on_interrupt and self.__interrupt is None:
+            raise ValueError('waking on interrupt needs an interrupt pin')
+        self.stop_adaptive_scan()
+        self.__adaptive_timer = timer
+        self.__adaptive_poll = self.poll if poll is None else poll
+        self.__fast_period_ms = fast_period_ms
+        self.__slow_period_ms = slow_period_ms
+        self.__active_window_ms = active_window_ms
+        self.__wake_on_interrupt = wake_on_interrupt
+        self.__last_activity = time.ticks_ms()
+        if wake_on_interrupt:
+            self.__install_interrupt()
+        self.__set_scan_period(fast_period_ms)
+
+    def stop_adaptive_scan(self) -> None:
+        if self.__adaptive_timer is None:
+            return
+        if self.__wake_on_interrupt:
+            self.__wake_on_interrupt = False
+            self.__install_interrupt()
+        self.__adaptive_timer.deinit()
+        self.__adaptive_timer = None
+        self.__scan_period_ms = 0
+
+    @property
+    def scan_period_ms(self) -> int:
+        return self.__scan_period_ms
+
+    def __set_scan_period(self, period_ms: int) -> None:
+        if period_ms == self.__scan_period_ms:
+            return
+        self.__scan_period_ms = period_ms
+        if period_ms:
+            self.__adaptive_timer.init(period=period_ms, mode=machine.Timer.PERIODIC,
+                                       callback=lambda t: self.__adaptive_tick())
+        else:
+            self.__adaptive_timer.deinit()
+
+    def __adaptive_tick(self) -> None:
+        if self.__adaptive_timer is None:
+            return
+        self.__adaptive_poll()
+        now = time.ticks_ms()
+        if self.__state or self.__rising or self.__falling or self.__bouncing():
+            self.__last_activity = now
+            self.__set_scan_period(self.__fast_period_ms)
+        elif time.ticks_diff(now, self.__last_activity) >= self.__active_window_ms:
+            self.__set_scan_period(0 if self.__wake_on_interrupt else self.__slow_period_ms)
+
+    def __wake(self, _) -> None:
+        if self.__adaptive_timer is None:
+            return
+        self.__last_activity = time.ticks_ms()
+        self.__set_scan_period(self.__fast_period_ms)
+
+    def __bouncing(self) -> bool:
+        for counter in self.__counters:
+            if counter:
+                return True
+        return False
+
+    @property
+    def frame(self) -> bytearray:
+        return self.__frame
+
+    @property
+    def state(self) -> int:
+        return self.__state
+
+    @property
+    def rising(self) -> int:
+        return self.__rising
+
+    @property
+    def falling(self) -> int:
+        return self.__falling
+
+    @property
+    def changed(self) -> int:
+        return self.__rising | self.__falling
+
+    @property
+    def values(self) -> list:
+        frame = self.scan()
         for i in range(self.__pins):
-            self.__values[i] = self.__serial.value()
-            t.sleep_ms(1)
-            self.__clock.value(0)
-            t.sleep_ms(1)
-            self.__clock(1)
-            t.sleep_ms(1)
+            self.__values[i] = (frame[i >> 3] >> (i & 7)) & 1
         return self.__values
 
     def value(self, index: int) -> int:
         return self.values[index]
 
+    @property
+    def timing(self) -> ShiftTiming:
+        return self.__timing
+
+    def set_timing(self, timing: ShiftTiming) -> None:
+        self.__timing = timing
+        if self.__spi is not None:
+            self.__spi.init(baudrate=timing.baudrate)
+
     @property
     def ic_count(self) -> int:
         return self.__ic_count
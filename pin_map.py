@@ -0,0 +1,73 @@
+class PinMap:
+
+    def __init__(self, layout: dict):
+        # layout maps a name to a chain pin index or to an ordered list of indexes (group bit i -> indexes[i])
+        self.__indexes = {}
+        self.__masks = {}
+        self.__tables = {}
+        for name in layout:
+            indexes = layout[name]
+            if isinstance(indexes, int):
+                indexes = [indexes]
+            else:
+                indexes = list(indexes)
+            self.__indexes[name] = indexes
+            self.__masks[name] = PinMap.__to_mask(indexes)
+            self.__tables[name] = PinMap.__compile(indexes)
+
+    @staticmethod
+    def __to_mask(indexes: list) -> int:
+        mask = 0
+        for index in indexes:
+            mask |= 1 << index
+        return mask
+
+    @staticmethod
+    def __compile(indexes: list) -> list:
+        # one lookup table per nibble of the group value, each entry is the chain mask of that nibble
+        tables = []
+        for start in range(0, len(indexes), 4):
+            chunk = indexes[start:start + 4]
+            table = []
+            for value in range(1 << len(chunk)):
+                mask = 0
+                for bit in range(len(chunk)):
+                    if (value >> bit) & 1:
+                        mask |= 1 << chunk[bit]
+                table.append(mask)
+            tables.append(table)
+        return tables
+
+    @property
+    def names(self) -> list:
+        return list(self.__indexes)
+
+    def index(self, name: str) -> int:
+        return self.__indexes[name][0]
+
+    def indexes(self, name: str) -> list:
+        return self.__indexes[name]
+
+    def mask(self, name: str) -> int:
+        return self.__masks[name]
+
+    def encode(self, name: str, bits: int) -> int:
+        mask = 0
+        for table in self.__tables[name]:
+            mask |= table[bits & (len(table) - 1)]
+            bits >>= 4
+        return mask
+
+    def decode(self, name: str, chain_mask: int) -> int:
+        bits = 0
+        indexes = self.__indexes[name]
+        for bit in range(len(indexes)):
+            if (chain_mask >> indexes[bit]) & 1:
+                bits |= 1 << bit
+        return bits
+
+    def write(self, serial_to_parallel, name: str, bits: int, commit=True) -> None:
+        serial_to_parallel.write_mask(self.__masks[name], self.encode(name, bits), commit)
+
+    def render(self, chain_mask: int) -> dict:
+        return {name: self.decode(name, chain_mask) for name in self.__indexes}
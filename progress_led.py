@@ -1,27 +1,22 @@
 from serial_to_parallel import SerialToParallel
-from led import Led
 
 
 class ProgressLed:
 
     def __init__(self, serial_to_parallel: SerialToParallel, indexes: list, init_value: int = 0):
         self.__serial_to_parallel = serial_to_parallel
-        self.__LEDs = []
+        self.__count = len(indexes)
+        # levels[v] is the chain mask with the first v LEDs on, so a new value is one masked write
+        self.__levels = [0]
         for led_index in indexes:
-            self.__LEDs.append(Led(serial_to_parallel, led_index, 0))
-        for i in range(init_value):
-            self.__LEDs[i].on(commit=False)
-        self.__serial_to_parallel.commit()
-        self.__value = init_value
+            self.__levels.append(self.__levels[-1] | (1 << led_index))
+        self.__mask = self.__levels[-1]
+        self.__value = 0
+        self.set_value(init_value)
 
     def set_value(self, value: int, commit=True):
-        for i in range(len(self.__LEDs)):
-            if i < value:
-                self.__LEDs[i].on(commit=False)
-            else:
-                self.__LEDs[i].off(commit=False)
-        if commit:
-            self.commit()
+        value = max(0, min(self.__count, value))
+        self.__serial_to_parallel.write_mask(self.__mask, self.__levels[value], commit=commit)
         self.__value = value
 
     def commit(self) -> None:
@@ -31,8 +26,12 @@ class ProgressLed:
     def value(self) -> int:
         return self.__value
 
+    @property
+    def mask(self) -> int:
+        return self.__mask
+
     def increase(self, commit=True) -> None:
-        if self.__value < len(self.__LEDs):
+        if self.__value < self.__count:
             self.set_value(self.__value + 1, commit=commit)
 
     def decrease(self, commit=True) -> None:
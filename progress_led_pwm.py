@@ -1,20 +1,26 @@
 from serial_to_parallel import SerialToParallel
 from progress_led import ProgressLed
-
-import machine
+from pwm_pool import PwmPool
 
 
 class ProgressLedPwm(ProgressLed):
 
     def __init__(self, serial_to_parallel: SerialToParallel, indexes: list, pwm_pin: int, init_light_density: int = 0,
-                 init_frequency: int = 1000):
+                 init_frequency: int = 1000, pwm_pool: PwmPool = None):
         super().__init__(serial_to_parallel, indexes)
-        self.__pwm = machine.PWM(machine.Pin(pwm_pin, mode=machine.Pin.OUT))
-        self.__pwm.freq(init_frequency)
-        self.__pwm.duty(init_light_density)
+        self.__pwm_pool = pwm_pool if pwm_pool is not None else PwmPool.default()
+        self.__pwm_pin = pwm_pin
+        self.__pwm = self.__pwm_pool.allocate(pwm_pin, init_frequency, init_light_density)
+
+    @property
+    def pwm_pin(self) -> int:
+        return self.__pwm_pin
 
     def set_frequency(self, frequency: int) -> None:
-        self.__pwm.freq(frequency)
+        self.__pwm_pool.set_frequency([self.__pwm_pin], frequency)
 
     def set_light_density(self, pwm_duty: int) -> None:
         self.__pwm.duty(pwm_duty)
+
+    def release(self) -> None:
+        self.__pwm_pool.release(self.__pwm_pin)
@@ -0,0 +1,15 @@
+from pin_map import PinMap
+
+IC595_COUNT = 8
+IC165_COUNT = 3
+
+# 74HC595 outputs, digits are ordered a, b, c, d, e, f, g, dot
+OUTPUTS = PinMap({
+    'red_progress': [30, 31, 0, 1, 2, 3, 4, 5, 6, 7],
+    'green_progress': [24, 25, 26, 27, 28, 29, 8, 9, 10, 11],
+    'blue_progress': [22, 21, 20, 19, 18, 17, 15, 14, 13, 12],
+    'digit1': [32, 33, 38, 37, 36, 34, 35, 39],
+    'digit2': [40, 41, 46, 45, 44, 42, 43, 47],
+    'digit3': [48, 49, 54, 53, 52, 50, 51, 55],
+    'digit4': [56, 57, 62, 61, 60, 58, 59, 63],
+})
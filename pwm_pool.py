@@ -0,0 +1,109 @@
+import machine
+
+# ESP32 LEDC: 8 high speed and 8 low speed channels, 4 timers per speed mode
+ESP32_PWM_CHANNELS = 16
+ESP32_PWM_TIMERS = 8
+
+_default_pool = None
+
+
+class PwmPool:
+
+    def __init__(self, channels: int = ESP32_PWM_CHANNELS, timers: int = ESP32_PWM_TIMERS):
+        # outputs with the same frequency share one LEDC timer, so a timer is counted per distinct frequency
+        self.__channels = channels
+        self.__timers = timers
+        self.__pwms = {}
+        self.__frequencies = {}
+        self.__groups = {}
+
+    @staticmethod
+    def default():
+        global _default_pool
+        if _default_pool is None:
+            _default_pool = PwmPool()
+        return _default_pool
+
+    def allocate(self, pin: int, frequency: int, duty: int = 0) -> machine.PWM:
+        if pin in self.__pwms:
+            raise ValueError('PWM pin ' + str(pin) + ' is already allocated')
+        if len(self.__pwms) >= self.__channels:
+            raise RuntimeError('no free PWM channel for pin ' + str(pin) + ', ' + self.report())
+        self.__check_timer(frequency, [])
+        pin_object = machine.Pin(pin, mode=machine.Pin.OUT)
+        pin_object.off()
+        pwm = machine.PWM(pin_object)
+        pwm.freq(frequency)
+        pwm.duty(duty)
+        self.__pwms[pin] = pwm
+        self.__join(pin, frequency)
+        return pwm
+
+    def release(self, pin: int) -> None:
+        pwm = self.__pwms.pop(pin, None)
+        if pwm is None:
+            return
+        pwm.deinit()
+        self.__leave(pin)
+
+    def pwm(self, pin: int) -> machine.PWM:
+        return self.__pwms[pin]
+
+    def frequency(self, pin: int) -> int:
+        return self.__frequencies[pin]
+
+    def set_frequency(self, pins: list, frequency: int) -> None:
+        # moves the pins to the timer of the new frequency, all of them or none
+        self.__check_timer(frequency, pins)
+        for pin in pins:
+            if self.__frequencies[pin] == frequency:
+                continue
+            self.__leave(pin)
+            self.__pwms[pin].freq(frequency)
+            self.__join(pin, frequency)
+
+    def set_group_frequency(self, frequency: int, new_frequency: int) -> None:
+        self.set_frequency(list(self.__groups.get(frequency, [])), new_frequency)
+
+    def set_duty(self, pin: int, duty: int) -> None:
+        self.__pwms[pin].duty(duty)
+
+    def set_duties(self, duties: list) -> None:
+        # duties is a list of (pin, duty)
+        pwms = self.__pwms
+        for pin, duty in duties:
+            pwms[pin].duty(duty)
+
+    def usage(self) -> dict:
+        return {'channels': len(self.__pwms), 'max_channels': self.__channels, 'timers': len(self.__groups),
+                'max_timers': self.__timers, 'groups': {frequency: list(pins) for frequency, pins in
+                                                        self.__groups.items()}}
+
+    def report(self) -> str:
+        return (str(len(self.__pwms)) + '/' + str(self.__channels) + ' channels, ' + str(len(self.__groups)) + '/' +
+                str(self.__timers) + ' timers in use')
+
+    def __check_timer(self, frequency: int, moving: list) -> None:
+        if frequency in self.__groups:
+            return
+        # a group that the moving pins leave empty frees its timer
+        freed = 0
+        for group_frequency in self.__groups:
+            members = self.__groups[group_frequency]
+            if all(pin in moving for pin in members):
+                freed += 1
+        if len(self.__groups) - freed >= self.__timers:
+            raise RuntimeError('no free PWM timer for ' + str(frequency) + 'Hz, ' + self.report())
+
+    def __join(self, pin: int, frequency: int) -> None:
+        self.__frequencies[pin] = frequency
+        if frequency not in self.__groups:
+            self.__groups[frequency] = []
+        self.__groups[frequency].append(pin)
+
+    def __leave(self, pin: int) -> None:
+        frequency = self.__frequencies.pop(pin)
+        members = self.__groups[frequency]
+        members.remove(pin)
+        if not members:
+            del self.__groups[frequency]
@@ -1,29 +1,43 @@
 from serial_to_parallel import SerialToParallel
 from led_pwm import LedPwm
+from pwm_pool import PwmPool
 
 
 class RGB:
 
     def __init__(self, serial_to_parallel: SerialToParallel, red_pin_index: int, green_pin_index: int,
                  blue_pin_index: int, red_pwm_pin: int, green_pwm_pin: int, blue_pwm_pin: int, red_value: int = 0,
-                 green_value: int = 0, blue_value: int = 0, pwm_frequency: int = 1000):
-        self.__red = LedPwm(serial_to_parallel=serial_to_parallel, pin_index=red_pin_index, pwm_pin=red_pwm_pin,
-                            init_value=1, pwm_duty=red_value, pwm_frequency=pwm_frequency)
-        self.__green = LedPwm(serial_to_parallel=serial_to_parallel, pin_index=green_pin_index, pwm_pin=green_pwm_pin,
-                              init_value=1, pwm_duty=green_value, pwm_frequency=pwm_frequency)
-        self.__blue = LedPwm(serial_to_parallel=serial_to_parallel, pin_index=blue_pin_index, pwm_pin=blue_pwm_pin,
-                             init_value=1, pwm_duty=blue_value, pwm_frequency=pwm_frequency)
+                 green_value: int = 0, blue_value: int = 0, pwm_frequency: int = 1000, pwm_pool: PwmPool = None):
+        # the three channels share one frequency, so they take a single LEDC timer
+        self.__pwm_pool = pwm_pool if pwm_pool is not None else PwmPool.default()
+        channels = []
+        try:
+            for pin_index, pwm_pin, value in ((red_pin_index, red_pwm_pin, red_value),
+                                              (green_pin_index, green_pwm_pin, green_value),
+                                              (blue_pin_index, blue_pwm_pin, blue_value)):
+                channels.append(LedPwm(serial_to_parallel=serial_to_parallel, pin_index=pin_index, pwm_pin=pwm_pin,
+                                       init_value=1, pwm_duty=value, pwm_frequency=pwm_frequency,
+                                       pwm_pool=self.__pwm_pool))
+        except Exception:
+            # gives back the channels taken so far, so the pool usage stays right and the constructor can be retried
+            for channel in channels:
+                channel.off()
+                channel.release()
+            raise
+        self.__red, self.__green, self.__blue = channels
         self.__serial_to_parallel = serial_to_parallel
 
     def set_rgb(self, r: int, g: int, b: int) -> None:
-        self.__red.set_light_density(r)
-        self.__green.set_light_density(g)
-        self.__blue.set_light_density(b)
+        self.__pwm_pool.set_duties(((self.__red.pwm_pin, r), (self.__green.pwm_pin, g), (self.__blue.pwm_pin, b)))
 
     def set_frequency(self, frequency: int) -> None:
-        self.__red.set_pwm_frequency(frequency)
-        self.__green.set_pwm_frequency(frequency)
-        self.__blue.set_pwm_frequency(frequency)
+        # moves the whole group to the new frequency at once, checked against the free timers first
+        self.__pwm_pool.set_frequency([self.__red.pwm_pin, self.__green.pwm_pin, self.__blue.pwm_pin], frequency)
+
+    def release(self) -> None:
+        self.__red.release()
+        self.__green.release()
+        self.__blue.release()
 
     @property
     def red(self) -> LedPwm:
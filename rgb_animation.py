@@ -0,0 +1,129 @@
+from rgb import RGB
+from tick_scheduler import TickScheduler
+
+import array
+
+
+def gamma_table(gamma: float = 2.2, max_duty: int = 1023, levels: int = 256) -> array.array:
+    # the only float math, done once: level 0..levels-1 to a perceptually even PWM duty
+    top = levels - 1
+    return array.array('H', [int(max_duty * ((level / top) ** gamma) + 0.5) for level in range(levels)])
+
+
+class KeyframeAnimation:
+
+    def __init__(self, rgb: RGB, keyframes: list, levels: list, loop: bool = False):
+        # levels is the current 0..255 color of rgb, it is updated in place as the animation runs
+        self.__rgb = rgb
+        self.__keyframes = keyframes
+        self.__levels = levels
+        self.__start = [levels[0], levels[1], levels[2]]
+        self.__loop = loop
+        self.__index = 0
+        self.__elapsed = 0
+        self.__duties = [-1, -1, -1]
+
+    @property
+    def rgb(self) -> RGB:
+        return self.__rgb
+
+    def step(self, elapsed_ms: int, table: array.array) -> bool:
+        # moves the color on by elapsed_ms, returns False once the last keyframe of a non looping animation is shown
+        running = True
+        keyframe = self.__keyframes[self.__index]
+        duration = keyframe[3]
+        elapsed = self.__elapsed + elapsed_ms
+        start = self.__start
+        if elapsed >= duration:
+            r, g, b = keyframe[0], keyframe[1], keyframe[2]
+            start[0], start[1], start[2] = r, g, b
+            elapsed = 0
+            self.__index += 1
+            if self.__index == len(self.__keyframes):
+                if self.__loop:
+                    self.__index = 0
+                else:
+                    running = False
+        else:
+            r = start[0] + (keyframe[0] - start[0]) * elapsed // duration
+            g = start[1] + (keyframe[1] - start[1]) * elapsed // duration
+            b = start[2] + (keyframe[2] - start[2]) * elapsed // duration
+        self.__elapsed = elapsed
+        levels = self.__levels
+        levels[0], levels[1], levels[2] = r, g, b
+        r, g, b = table[r], table[g], table[b]
+        duties = self.__duties
+        if r != duties[0] or g != duties[1] or b != duties[2]:
+            duties[0], duties[1], duties[2] = r, g, b
+            self.__rgb.set_rgb(r, g, b)
+        return running
+
+
+class RgbAnimator:
+
+    def __init__(self, scheduler: TickScheduler, gamma: float = 2.2, max_duty: int = 1023):
+        # steps every running animation on the shared scheduler tick
+        self.__scheduler = scheduler
+        self.__table = gamma_table(gamma, max_duty)
+        self.__animations = []
+        self.__levels = {}
+
+    @property
+    def table(self) -> array.array:
+        return self.__table
+
+    def levels(self, rgb: RGB) -> list:
+        # the 0..255 color last written to rgb by this animator
+        if rgb not in self.__levels:
+            self.__levels[rgb] = [0, 0, 0]
+        return self.__levels[rgb]
+
+    def set_color(self, rgb: RGB, r: int, g: int, b: int) -> None:
+        self.stop(rgb)
+        levels = self.levels(rgb)
+        levels[0], levels[1], levels[2] = r, g, b
+        table = self.__table
+        rgb.set_rgb(table[r], table[g], table[b])
+
+    def animate(self, rgb: RGB, keyframes: list, start: tuple = None, loop: bool = False) -> None:
+        # keyframes is a list of (r, g, b, duration_ms) with 0..255 levels, each one fades from the previous color.
+        # the first one fades from start, or from the current color when start is None
+        self.stop(rgb)
+        if not keyframes:
+            return
+        levels = self.levels(rgb)
+        if start is not None:
+            levels[0], levels[1], levels[2] = start[0], start[1], start[2]
+        self.__animations.append(KeyframeAnimation(rgb, keyframes, levels, loop))
+        self.__scheduler.add(self)
+
+    def stop(self, rgb: RGB) -> None:
+        for animation in self.__animations:
+            if animation.rgb is rgb:
+                self.__animations.remove(animation)
+                break
+        if not self.__animations:
+            self.__scheduler.remove(self)
+
+    def stop_all(self) -> None:
+        self.__animations = []
+        self.__scheduler.remove(self)
+
+    def animating(self, rgb: RGB) -> bool:
+        for animation in self.__animations:
+            if animation.rgb is rgb:
+                return True
+        return False
+
+    def step(self, elapsed_ms: int) -> bool:
+        table = self.__table
+        finished = None
+        for animation in self.__animations:
+            if not animation.step(elapsed_ms, table):
+                if finished is None:
+                    finished = []
+                finished.append(animation)
+        if finished is not None:
+            for animation in finished:
+                self.__animations.remove(animation)
+        return len(self.__animations) > 0
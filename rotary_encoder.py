@@ -0,0 +1,71 @@
+from parallel_to_serial import ParallelToSerial
+
+import array
+
+# count change indexed by (previous AB << 2) | current AB, invalid double steps count as 0
+QUADRATURE_STEPS = (0, 1, -1, 0, -1, 0, 0, 1, 1, 0, 0, -1, 0, -1, 1, 0)
+
+
+class RotaryEncoders:
+
+    def __init__(self, parallel_to_serial: ParallelToSerial, pins: list, steps_per_detent: int = 4):
+        # pins is a list of (a_pin_index, b_pin_index) on the 74HC165 chain, one pair per encoder.
+        # debounce on the chain should stay off, the transition table already ignores bounces
+        self.__parallel_to_serial = parallel_to_serial
+        self.__count = len(pins)
+        self.__a = bytearray([a for a, _ in pins])
+        self.__b = bytearray([b for _, b in pins])
+        self.__mask = 0
+        for a, b in pins:
+            self.__mask |= (1 << a) | (1 << b)
+        self.__steps_per_detent = steps_per_detent
+        self.__states = bytearray(self.__count)
+        self.__counts = array.array('i', [0 for _ in range(self.__count)])
+        self.__taken = array.array('i', [0 for _ in range(self.__count)])
+        self.__last = parallel_to_serial.state
+        for i in range(self.__count):
+            self.__states[i] = self.__ab(self.__last, i)
+        parallel_to_serial.subscribe(lambda rising, falling: self.update(self.__parallel_to_serial.state))
+
+    def __ab(self, state: int, i: int) -> int:
+        return (((state >> self.__a[i]) & 1) << 1) | ((state >> self.__b[i]) & 1)
+
+    def update(self, state: int) -> None:
+        changed = (state ^ self.__last) & self.__mask
+        self.__last = state
+        if not changed:
+            return
+        a = self.__a
+        b = self.__b
+        states = self.__states
+        counts = self.__counts
+        for i in range(self.__count):
+            if not (((changed >> a[i]) | (changed >> b[i])) & 1):
+                continue
+            current = (((state >> a[i]) & 1) << 1) | ((state >> b[i]) & 1)
+            counts[i] += QUADRATURE_STEPS[(states[i] << 2) | current]
+            states[i] = current
+
+    @property
+    def encoders_count(self) -> int:
+        return self.__count
+
+    def steps(self, encoder: int) -> int:
+        return self.__counts[encoder]
+
+    def position(self, encoder: int) -> int:
+        count = self.__counts[encoder]
+        if count >= 0:
+            return count // self.__steps_per_detent
+        return -((-count) // self.__steps_per_detent)
+
+    def take(self, encoder: int) -> int:
+        # detents turned since the previous take, positive when B leads A
+        position = self.position(encoder)
+        delta = position - self.__taken[encoder]
+        self.__taken[encoder] = position
+        return delta
+
+    def reset(self, encoder: int) -> None:
+        self.__counts[encoder] = 0
+        self.__taken[encoder] = 0
@@ -1,45 +1,433 @@
+from shift_timing import ShiftTiming
+from pwm_pool import PwmPool
+
 import machine
 import time
 
+SELF_TEST_PATTERN = (0x55, 0xAA, 0x0F, 0xF0, 0x33, 0xCC, 0x01, 0x80)
+
 
 class SerialToParallel:
 
     def __init__(self, serial: int, storage_register_clock: int, register_clock: int,
-                 ic_count: int = 1, init_values: list = None):
-        self.__serial = machine.Pin(serial, mode=machine.Pin.OUT)
-        self.__serial.off()
-        self.__register_clock = machine.Pin(storage_register_clock, mode=machine.Pin.OUT)
-        self.__register_clock.off()
-        self.__storage_register_clock = machine.Pin(register_clock, mode=machine.Pin.OUT)
-        self.__storage_register_clock.off()
+                 ic_count: int = 1, init_values: list = None, spi: machine.SPI = None,
+                 timing: ShiftTiming = None, output_enable: int = None, brightness: int = 1023,
+                 brightness_frequency: int = 1000, pwm_pool: PwmPool = None):
+        self.__spi = spi
+        if spi is None:
+            self.__serial = machine.Pin(serial, mode=machine.Pin.OUT)
+            self.__serial.off()
+            self.__shift_clock = machine.Pin(register_clock, mode=machine.Pin.OUT)
+            self.__shift_clock.off()
+        else:
+            # serial and register_clock are the MOSI and SCK pins of the given SPI bus
+            self.__spi.init(firstbit=machine.SPI.LSB)
+        self.__latch_clock = machine.Pin(storage_register_clock, mode=machine.Pin.OUT)
+        self.__latch_clock.off()
+        # ~OE is active low, so the PWM duty is the inverse of the brightness
+        if output_enable is None:
+            self.__output_enable = None
+        else:
+            self.__pwm_pool = pwm_pool if pwm_pool is not None else PwmPool.default()
+            self.__output_enable_pin = output_enable
+            self.__output_enable = self.__pwm_pool.allocate(output_enable, brightness_frequency, 1023)
+        self.__brightness = brightness
+        self.__fade_timer = None
+        self.set_brightness(brightness)
+        self.__timing = None
+        self.set_timing(ShiftTiming.datasheet() if timing is None else timing)
         self.__ic_count = ic_count
         self.__pins = ic_count * 8
+        # writers fill the back frame, commits swap it with the front frame that is shifted out
+        self.__frame = bytearray(ic_count)
+        self.__front = bytearray(ic_count)
+        self.__shifting = False
+        self.__commit_requested = False
+        self.__readback = None
+        self.__dirty = True
+        self.__commits = 0
+        self.__skipped_commits = 0
+        self.__batch_depth = 0
+        self.__pending_force = False
+        self.__auto_flush = False
+        self.__auto_flush_timer = None
+        self.__output_owner = None
         if init_values is None:
-            self.__values = [0 for _ in range(ic_count * 8)]
-        else:
-            self.__values = init_values
-        self.set_values(self.__values)
+            init_values = [0 for _ in range(ic_count * 8)]
+        self.set_values(init_values)
 
     def set_values(self, values: list, commit=True) -> None:
-        self.__values = values
+        value = 0
+        for index in range(min(len(values), self.__pins)):
+            if values[index]:
+                value |= 1 << index
+        self.write_mask((1 << self.__pins) - 1, value, commit)
+
+    def commit(self, force=False) -> None:
+        if self.__batch_depth > 0 or self.__auto_flush:
+            self.__pending_force = self.__pending_force or force
+            return
+        self.__flush(force)
+
+    def __flush(self, force=False) -> None:
+        if self.__shifting:
+            # called from an IRQ while a shift is running, the running commit picks it up when it finishes
+            self.__commit_requested = True
+            return
+        if not self.__dirty and not force:
+            self.__skipped_commits += 1
+            return
+        if self.__output_owner is not None:
+            self.__publish()
+            self.__commits += 1
+            self.__output_owner(self.__front)
+            return
+        self.__shifting = True
+        try:
+            while True:
+                self.__commit_requested = False
+                self.__publish()
+                self.__commits += 1
+                self._shift_out(self.__front)
+                # only the first pass reads back, the inputs are already shifted out by then
+                self.__readback = None
+                self.__latch()
+                if not (self.__commit_requested and self.__dirty):
+                    break
+        finally:
+            self.__shifting = False
+
+    def _shift_out(self, frame: bytearray) -> None:
+        if self.__spi is None:
+            self.__shift_bit_bang(frame)
+        elif self.__readback is None:
+            self.__spi.write(frame)
+        else:
+            self.__spi.write_readinto(frame, self.__readback)
+
+    def set_output_owner(self, owner) -> None:
+        # while an owner is set, commits publish the frame and call owner(frame) instead of shifting it out, the
+        # owner latches its own frames with show(). None gives latching back to the commits
+        self.__output_owner = owner
+
+    @property
+    def output_owner(self):
+        return self.__output_owner
+
+    def show(self, frame: bytearray) -> bool:
+        # shifts and latches a frame built elsewhere, such as a modulation bit plane, leaving the shadow frame alone
+        if self.__shifting:
+            return False
+        self.__shifting = True
+        try:
+            self._shift_out(frame)
+            self.__latch()
+        finally:
+            self.__shifting = False
+        return True
+
+    def exchange(self, readback: bytearray) -> bool:
+        # shifts the outputs out and reads what MISO shifted in meanwhile into readback (same length as the frame).
+        # inside a batch or with auto flush the latched frame is shifted again, so pending writes stay pending.
+        # returns False and leaves readback alone when a shift was already running
+        if self.__spi is None:
+            raise ValueError('exchange needs an SPI bus')
+        if self.__shifting:
+            return False
+        self.__readback = readback
+        try:
+            if self.__output_owner is not None:
+                # shifted without a latch, the owner's next frame replaces the shift register contents
+                self.__shifting = True
+                try:
+                    self._shift_out(self.__front)
+                finally:
+                    self.__shifting = False
+            elif self.__batch_depth > 0 or self.__auto_flush:
+                self.show(self.__front)
+            else:
+                self.__flush(True)
+        finally:
+            self.__readback = None
+        return True
+
+    def __publish(self) -> None:
+        state = machine.disable_irq()
+        front = self.__frame
+        back = self.__front
+        for i in range(len(front)):
+            back[i] = front[i]
+        self.__front = front
+        self.__frame = back
+        self.__dirty = False
+        machine.enable_irq(state)
+
+    def __latch(self) -> None:
+        latch_us = self.__timing.latch_us
+        self.__latch_clock.on()
+        if latch_us:
+            time.sleep_us(latch_us)
+        self.__latch_clock.off()
+        if latch_us:
+            time.sleep_us(latch_us)
+
+    def batch(self):
+        return self
+
+    def __enter__(self):
+        self.__batch_depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.__batch_depth -= 1
+        # a block that raised may have left a half-applied update, it stays in the back frame until the next commit
+        if self.__batch_depth == 0 and exc_type is None:
+            force = self.__pending_force
+            self.__pending_force = False
+            self.commit(force)
+        return False
+
+    def start_auto_flush(self, timer: machine.Timer, max_rate: int = 100) -> None:
+        self.stop_auto_flush()
+        self.__auto_flush = True
+        self.__auto_flush_timer = timer
+        timer.init(period=max(1, 1000 // max_rate), mode=machine.Timer.PERIODIC,
+                   callback=lambda t: self.__auto_flush_tick())
+
+    def stop_auto_flush(self) -> None:
+        if self.__auto_flush_timer is not None:
+            self.__auto_flush_timer.deinit()
+            self.__auto_flush_timer = None
+        if self.__auto_flush:
+            self.__auto_flush = False
+            force = self.__pending_force
+            self.__pending_force = False
+            self.commit(force)
+
+    async def auto_flush_task(self, max_rate: int = 100) -> None:
+        import uasyncio
+        period = max(1, 1000 // max_rate)
+        self.stop_auto_flush()
+        self.__auto_flush = True
+        while self.__auto_flush:
+            self.__auto_flush_tick()
+            await uasyncio.sleep_ms(period)
+
+    def __auto_flush_tick(self) -> None:
+        if self.__batch_depth > 0:
+            return
+        if self.__dirty or self.__pending_force:
+            force = self.__pending_force
+            self.__pending_force = False
+            self.__flush(force)
+
+    @property
+    def auto_flush(self) -> bool:
+        return self.__auto_flush
+
+    @property
+    def in_batch(self) -> bool:
+        return self.__batch_depth > 0
+
+    def __shift_bit_bang(self, frame: bytearray, loopback: machine.Pin = None, readback: bytearray = None) -> None:
+        clock_us = self.__timing.clock_us
+        for i in range(len(frame)):
+            byte = frame[i]
+            for bit in range(8):
+                self.__serial.value((byte >> bit) & 1)
+                if loopback is not None and loopback.value():
+                    readback[i] |= 1 << bit
+                if clock_us:
+                    time.sleep_us(clock_us)
+                self.__shift_clock.on()
+                if clock_us:
+                    time.sleep_us(clock_us)
+                self.__shift_clock.off()
+
+    @property
+    def brightness(self) -> int:
+        return self.__brightness
+
+    def set_brightness(self, brightness: int) -> None:
+        if self.__output_enable is None:
+            return
+        self.__brightness = max(0, min(1023, brightness))
+        self.__output_enable.duty(1023 - self.__brightness)
+
+    def set_brightness_frequency(self, frequency: int) -> None:
+        if self.__output_enable is not None:
+            self.__pwm_pool.set_frequency([self.__output_enable_pin], frequency)
+
+    def fade_brightness(self, brightness: int, duration: int, timer: machine.Timer, period: int = 20) -> None:
+        self.stop_fade()
+        start = self.__brightness
+        steps = max(1, duration // period)
+        step = [0]
+
+        def callback(t):
+            step[0] += 1
+            self.set_brightness(start + (brightness - start) * step[0] // steps)
+            if step[0] >= steps:
+                self.stop_fade()
+
+        self.__fade_timer = timer
+        timer.init(period=period, mode=machine.Timer.PERIODIC, callback=callback)
+
+    def stop_fade(self) -> None:
+        if self.__fade_timer is not None:
+            self.__fade_timer.deinit()
+            self.__fade_timer = None
+
+    @property
+    def timing(self) -> ShiftTiming:
+        return self.__timing
+
+    def set_timing(self, timing: ShiftTiming) -> None:
+        self.__timing = timing
+        if self.__spi is not None:
+            self.__spi.init(baudrate=timing.baudrate)
+
+    def self_test(self, loopback_pin: int = None, profiles: list = None):
+        # needs Q7' of the last 74HC595 wired back to loopback_pin, or to MISO when an SPI bus is used.
+        # test patterns are shifted in without latching, so the outputs keep their current state.
+        if self.__spi is None and loopback_pin is None:
+            raise ValueError('a loopback pin is needed for the bit-banged self test')
+        loopback = None if self.__spi is not None else machine.Pin(loopback_pin, mode=machine.Pin.IN)
+        if profiles is None:
+            profiles = ShiftTiming.profiles()
+        previous = self.__timing
+        chosen = None
+        for timing in profiles:
+            self.set_timing(timing)
+            if self.__loopback_passes(loopback):
+                chosen = timing
+                break
+        self.set_timing(previous if chosen is None else chosen)
+        self.commit(force=True)
+        return chosen
+
+    def __loopback_passes(self, loopback: machine.Pin) -> bool:
+        length = len(self.__frame)
+        expected = bytearray(length)
+        inverted = bytearray(length)
+        readback = bytearray(length)
+        for i in range(length):
+            expected[i] = SELF_TEST_PATTERN[i % len(SELF_TEST_PATTERN)]
+            inverted[i] = ~expected[i] & 0xFF
+        self.__shift_raw(expected, loopback, None)
+        for sent, check in ((inverted, expected), (expected, inverted)):
+            for i in range(length):
+                readback[i] = 0
+            self.__shift_raw(sent, loopback, readback)
+            if readback != check:
+                return False
+        return True
+
+    def __shift_raw(self, buffer: bytearray, loopback: machine.Pin, readback: bytearray) -> None:
+        if self.__spi is None:
+            self.__shift_bit_bang(buffer, loopback if readback is not None else None, readback)
+        elif readback is None:
+            self.__spi.write(buffer)
+        else:
+            self.__spi.write_readinto(buffer, readback)
+
+    def set_pin(self, index: int, value: int, commit=True) -> None:
+        state = machine.disable_irq()
+        frame = self.__frame
+        byte = frame[index >> 3]
+        if value:
+            new_byte = byte | (1 << (index & 7))
+        else:
+            new_byte = byte & ~(1 << (index & 7))
+        if new_byte != byte:
+            frame[index >> 3] = new_byte
+            self.__dirty = True
+        machine.enable_irq(state)
         if commit:
             self.commit()
 
-    def commit(self) -> None:
-        for data in self.__values:
-            self.__serial.value(data)
-            self.__storage_register_clock.on()
-            time.sleep_us(100)
-            self.__storage_register_clock.off()
-            time.sleep_us(100)
-        self.__register_clock.on()
-        time.sleep_us(100)
-        self.__register_clock.off()
-        time.sleep_us(100)
+    def get_pin(self, index: int) -> int:
+        return (self.__frame[index >> 3] >> (index & 7)) & 1
 
-    def set_pin(self, index: int, value: int, commit=True) -> None:
-        self.__values[index] = value
-        self.set_values(self.__values, commit)
+    @staticmethod
+    def to_mask(indexes: list) -> int:
+        mask = 0
+        for index in indexes:
+            mask |= 1 << index
+        return mask
+
+    @staticmethod
+    def range_mask(start: int, count: int) -> int:
+        return ((1 << count) - 1) << start
+
+    def write_mask(self, mask: int, value: int, commit=True) -> None:
+        # a commit from an IRQ swaps the frames, so the whole read-modify-write runs with IRQs off and lands in
+        # one frame
+        state = machine.disable_irq()
+        frame = self.__frame
+        i = 0
+        while mask and i < len(frame):
+            m = mask & 0xFF
+            if m:
+                byte = (frame[i] & ~m) | (value & m)
+                if frame[i] != byte:
+                    frame[i] = byte
+                    self.__dirty = True
+            mask >>= 8
+            value >>= 8
+            i += 1
+        machine.enable_irq(state)
+        if commit:
+            self.commit()
+
+    def set_mask(self, mask: int, commit=True) -> None:
+        self.write_mask(mask, mask, commit)
+
+    def clear_mask(self, mask: int, commit=True) -> None:
+        self.write_mask(mask, 0, commit)
+
+    def toggle_mask(self, mask: int, commit=True) -> None:
+        state = machine.disable_irq()
+        frame = self.__frame
+        i = 0
+        while mask and i < len(frame):
+            if mask & 0xFF:
+                frame[i] ^= mask & 0xFF
+                self.__dirty = True
+            mask >>= 8
+            i += 1
+        machine.enable_irq(state)
+        if commit:
+            self.commit()
+
+    def write_range(self, start: int, count: int, value: int, commit=True) -> None:
+        self.write_mask(self.range_mask(start, count), value << start, commit)
+
+    @property
+    def mask(self) -> int:
+        return int.from_bytes(self.__frame, 'little')
+
+    @property
+    def dirty(self) -> bool:
+        return self.__dirty
+
+    @property
+    def commits(self) -> int:
+        return self.__commits
+
+    @property
+    def skipped_commits(self) -> int:
+        return self.__skipped_commits
+
+    def reset_statistics(self) -> None:
+        self.__commits = 0
+        self.__skipped_commits = 0
+
+    @property
+    def frame(self) -> bytearray:
+        # read only view of the back frame, it is a different buffer after every commit and writes through it
+        # bypass dirty tracking, use the pin and mask methods instead
+        return self.__frame
 
     @property
     def ic_count(self) -> int:
@@ -50,5 +438,13 @@ class SerialToParallel:
         return self.ic_count * 8
 
     def set_ic_count(self, ic_count: int) -> None:
+        frame = bytearray(ic_count)
+        for i in range(min(ic_count, self.__ic_count)):
+            frame[i] = self.__frame[i]
+        state = machine.disable_irq()
+        self.__frame = frame
+        self.__front = bytearray(ic_count)
+        self.__dirty = True
+        machine.enable_irq(state)
         self.__ic_count = ic_count
         self.__pins = ic_count * 8
@@ -1,6 +1,18 @@
 from serial_to_parallel import SerialToParallel
+from pin_map import PinMap
 from led import Led
 
+# segment bits: a = bit 0 ... g = bit 6, dot = bit 7
+GLYPHS = {
+    '0': 0x3F, '1': 0x06, '2': 0x5B, '3': 0x4F, '4': 0x66, '5': 0x6D, '6': 0x7D, '7': 0x07, '8': 0x7F, '9': 0x6F,
+    'A': 0x77, 'a': 0x77, 'B': 0x7C, 'b': 0x7C, 'C': 0x39, 'c': 0x58, 'D': 0x5E, 'd': 0x5E, 'E': 0x79, 'e': 0x79,
+    'F': 0x71, 'f': 0x71, 'G': 0x3D, 'g': 0x6F, 'H': 0x76, 'h': 0x74, 'I': 0x06, 'i': 0x06, 'J': 0x0E, 'j': 0x0E,
+    'L': 0x38, 'l': 0x38, 'N': 0x54, 'n': 0x54, 'O': 0x3F, 'o': 0x5C, 'P': 0x73, 'p': 0x73, 'Q': 0x67, 'q': 0x67,
+    'R': 0x50, 'r': 0x50, 'S': 0x6D, 's': 0x6D, 'T': 0x78, 't': 0x78, 'U': 0x3E, 'u': 0x1C, 'Y': 0x6E, 'y': 0x6E,
+    'Z': 0x5B, 'z': 0x5B,
+}
+DIGITS = tuple(GLYPHS[str(digit)] for digit in range(10))
+
 
 class SevenSegment:
 
@@ -15,6 +27,8 @@ class SevenSegment:
         self.__g = Led(serial_to_parallel=serial_to_parallel, pin_index=g_pin_index, init_value=1)
         self.__dot = Led(serial_to_parallel=serial_to_parallel, pin_index=dot_pin_index, init_value=1)
         self.__serial_to_parallel = serial_to_parallel
+        self.__pin_map = PinMap({'segments': [a_pin_index, b_pin_index, c_pin_index, d_pin_index, e_pin_index,
+                                              f_pin_index, g_pin_index, dot_pin_index]})
 
     @property
     def a(self) -> Led:
@@ -51,458 +65,110 @@ class SevenSegment:
     def commit(self) -> None:
         self.__serial_to_parallel.commit()
 
+    def show(self, segments: int, commit=True) -> None:
+        self.__pin_map.write(self.__serial_to_parallel, 'segments', segments, commit)
+
+    def show_glyph(self, glyph: str, commit=True) -> None:
+        segments = GLYPHS.get(glyph)
+        if segments is not None:
+            self.show(segments, commit)
+
     def off(self, commit=True) -> None:
-        self.__a.off(commit=False)
-        self.__b.off(commit=False)
-        self.__c.off(commit=False)
-        self.__d.off(commit=False)
-        self.__e.off(commit=False)
-        self.__f.off(commit=False)
-        self.__g.off(commit=False)
-        self.__dot.off(commit=False)
-        if commit:
-            self.commit()
+        self.show(0, commit)
 
     def zero(self, commit=True) -> None:
-        self.__a.on(commit=False)
-        self.__b.on(commit=False)
-        self.__c.on(commit=False)
-        self.__d.on(commit=False)
-        self.__e.on(commit=False)
-        self.__f.on(commit=False)
-        self.__g.off(commit=False)
-        self.__dot.off(commit=False)
-        if commit:
-            self.commit()
+        self.show(GLYPHS['0'], commit)
 
     def one(self, commit=False) -> None:
-        self.__a.off(commit=False)
-        self.__b.on(commit=False)
-        self.__c.on(commit=False)
-        self.__d.off(commit=False)
-        self.__e.off(commit=False)
-        self.__f.off(commit=False)
-        self.__g.off(commit=False)
-        self.__dot.off(commit=False)
-        if commit:
-            self.commit()
+        self.show(GLYPHS['1'], commit)
 
     def two(self, commit=True) -> None:
-        self.__a.on(commit=False)
-        self.__b.on(commit=False)
-        self.__c.off(commit=False)
-        self.__d.on(commit=False)
-        self.__e.on(commit=False)
-        self.__f.off(commit=False)
-        self.__g.on(commit=False)
-        self.__dot.off(commit=False)
-        if commit:
-            self.commit()
+        self.show(GLYPHS['2'], commit)
 
     def three(self, commit=True) -> None:
-        self.__a.on(commit=False)
-        self.__b.on(commit=False)
-        self.__c.on(commit=False)
-        self.__d.on(commit=False)
-        self.__e.off(commit=False)
-        self.__f.off(commit=False)
-        self.__g.on(commit=False)
-        self.__dot.off(commit=False)
-        if commit:
-            self.commit()
+        self.show(GLYPHS['3'], commit)
 
     def four(self, commit=True) -> None:
-        self.__a.off(commit=False)
-        self.__b.on(commit=False)
-        self.__c.on(commit=False)
-        self.__d.off(commit=False)
-        self.__e.off(commit=False)
-        self.__f.on(commit=False)
-        self.__g.on(commit=False)
-        self.__dot.off(commit=False)
-        if commit:
-            self.commit()
+        self.show(GLYPHS['4'], commit)
 
     def five(self, commit=True) -> None:
-        self.__a.on(commit=False)
-        self.__b.off(commit=False)
-        self.__c.on(commit=False)
-        self.__d.on(commit=False)
-        self.__e.off(commit=False)
-        self.__f.on(commit=False)
-        self.__g.on(commit=False)
-        self.__dot.off(commit=False)
-        if commit:
-            self.commit()
+        self.show(GLYPHS['5'], commit)
 
     def six(self, commit=True) -> None:
-        self.__a.on(commit=False)
-        self.__b.off(commit=False)
-        self.__c.on(commit=False)
-        self.__d.on(commit=False)
-        self.__e.on(commit=False)
-        self.__f.on(commit=False)
-        self.__g.on(commit=False)
-        self.__dot.off(commit=False)
-        if commit:
-            self.commit()
+        self.show(GLYPHS['6'], commit)
 
     def seven(self, commit=True) -> None:
-        self.__a.on(commit=False)
-        self.__b.on(commit=False)
-        self.__c.on(commit=False)
-        self.__d.off(commit=False)
-        self.__e.off(commit=False)
-        self.__f.off(commit=False)
-        self.__g.off(commit=False)
-        self.__dot.off(commit=False)
-        if commit:
-            self.commit()
+        self.show(GLYPHS['7'], commit)
 
     def eight(self, commit=True) -> None:
-        self.__a.on(commit=False)
-        self.__b.on(commit=False)
-        self.__c.on(commit=False)
-        self.__d.on(commit=False)
-        self.__e.on(commit=False)
-        self.__f.on(commit=False)
-        self.__g.on(commit=False)
-        self.__dot.off(commit=False)
-        if commit:
-            self.commit()
+        self.show(GLYPHS['8'], commit)
 
     def nine(self, commit=True) -> None:
-        self.__a.on(commit=False)
-        self.__b.on(commit=False)
-        self.__c.on(commit=False)
-        self.__d.on(commit=False)
-        self.__e.off(commit=False)
-        self.__f.on(commit=False)
-        self.__g.on(commit=False)
-        self.__dot.off(commit=False)
-        if commit:
-            self.commit()
+        self.show(GLYPHS['9'], commit)
 
     def A(self, commit=True) -> None:
-        self.__a.on(commit=False)
-        self.__b.on(commit=False)
-        self.__c.on(commit=False)
-        self.__d.off(commit=False)
-        self.__e.on(commit=False)
-        self.__f.on(commit=False)
-        self.__g.on(commit=False)
-        self.__dot.off(commit=False)
-        if commit:
-            self.commit()
+        self.show(GLYPHS['A'], commit)
 
     def B(self, commit=True) -> None:
-        self.__a.off(commit=False)
-        self.__b.off(commit=False)
-        self.__c.on(commit=False)
-        self.__d.on(commit=False)
-        self.__e.on(commit=False)
-        self.__f.on(commit=False)
-        self.__g.on(commit=False)
-        self.__dot.off(commit=False)
-        if commit:
-            self.commit()
+        self.show(GLYPHS['B'], commit)
 
     def C(self, uppercase=True, commit=True) -> None:
-        if uppercase:
-            self.__a.on(commit=False)
-            self.__b.off(commit=False)
-            self.__c.off(commit=False)
-            self.__d.on(commit=False)
-            self.__e.on(commit=False)
-            self.__f.on(commit=False)
-            self.__g.off(commit=False)
-            self.__dot.off(commit=False)
-        else:
-            self.__a.off(commit=False)
-            self.__b.off(commit=False)
-            self.__c.off(commit=False)
-            self.__d.on(commit=False)
-            self.__e.on(commit=False)
-            self.__f.off(commit=False)
-            self.__g.on(commit=False)
-            self.__dot.off(commit=False)
-        if commit:
-            self.commit()
+        self.show(GLYPHS['C'] if uppercase else GLYPHS['c'], commit)
 
     def D(self, commit=True) -> None:
-        self.__a.off(commit=False)
-        self.__b.on(commit=False)
-        self.__c.on(commit=False)
-        self.__d.on(commit=False)
-        self.__e.on(commit=False)
-        self.__f.off(commit=False)
-        self.__g.on(commit=False)
-        self.__dot.off(commit=False)
-        if commit:
-            self.commit()
+        self.show(GLYPHS['D'], commit)
 
     def E(self, commit=True) -> None:
-        self.__a.on(commit=False)
-        self.__b.off(commit=False)
-        self.__c.off(commit=False)
-        self.__d.on(commit=False)
-        self.__e.on(commit=False)
-        self.__f.on(commit=False)
-        self.__g.on(commit=False)
-        self.__dot.off(commit=False)
-        if commit:
-            self.commit()
+        self.show(GLYPHS['E'], commit)
 
     def F(self, commit=True) -> None:
-        self.__a.on(commit=False)
-        self.__b.off(commit=False)
-        self.__c.off(commit=False)
-        self.__d.off(commit=False)
-        self.__e.on(commit=False)
-        self.__f.on(commit=False)
-        self.__g.on(commit=False)
-        self.__dot.off(commit=False)
-        if commit:
-            self.commit()
+        self.show(GLYPHS['F'], commit)
 
     def G(self, uppercase=True, commit=True) -> None:
-        if uppercase:
-            self.__a.on(commit=False)
-            self.__b.off(commit=False)
-            self.__c.on(commit=False)
-            self.__d.on(commit=False)
-            self.__e.on(commit=False)
-            self.__f.on(commit=False)
-            self.__g.off(commit=False)
-            self.__dot.off(commit=False)
-        else:
-            self.__a.on(commit=False)
-            self.__b.on(commit=False)
-            self.__c.on(commit=False)
-            self.__d.on(commit=False)
-            self.__e.off(commit=False)
-            self.__f.on(commit=False)
-            self.__g.on(commit=False)
-            self.__dot.off(commit=False)
-        if commit:
-            self.commit()
+        self.show(GLYPHS['G'] if uppercase else GLYPHS['g'], commit)
 
     def H(self, uppercase=True, commit=True) -> None:
-        if uppercase:
-            self.__a.off(commit=False)
-            self.__b.on(commit=False)
-            self.__c.on(commit=False)
-            self.__d.off(commit=False)
-            self.__e.on(commit=False)
-            self.__f.on(commit=False)
-            self.__g.on(commit=False)
-            self.__dot.off(commit=False)
-        else:
-            self.__a.off(commit=False)
-            self.__b.off(commit=False)
-            self.__c.on(commit=False)
-            self.__d.off(commit=False)
-            self.__e.on(commit=False)
-            self.__f.on(commit=False)
-            self.__g.on(commit=False)
-            self.__dot.off(commit=False)
-        if commit:
-            self.commit()
+        self.show(GLYPHS['H'] if uppercase else GLYPHS['h'], commit)
 
     def I(self, commit=True) -> None:
-        self.__a.off(commit=False)
-        self.__b.on(commit=False)
-        self.__c.on(commit=False)
-        self.__d.off(commit=False)
-        self.__e.off(commit=False)
-        self.__f.off(commit=False)
-        self.__g.off(commit=False)
-        self.__dot.off(commit=False)
-        if commit:
-            self.commit()
+        self.show(GLYPHS['I'], commit)
 
     def J(self, commit=True) -> None:
-        self.__a.off(commit=False)
-        self.__b.on(commit=False)
-        self.__c.on(commit=False)
-        self.__d.on(commit=False)
-        self.__e.off(commit=False)
-        self.__f.off(commit=False)
-        self.__g.off(commit=False)
-        self.__dot.off(commit=False)
-        if commit:
-            self.commit()
+        self.show(GLYPHS['J'], commit)
 
     def L(self, commit=True) -> None:
-        self.__a.off(commit=False)
-        self.__b.off(commit=False)
-        self.__c.off(commit=False)
-        self.__d.on(commit=False)
-        self.__e.on(commit=False)
-        self.__f.on(commit=False)
-        self.__g.off(commit=False)
-        self.__dot.off(commit=False)
-        if commit:
-            self.commit()
+        self.show(GLYPHS['L'], commit)
 
     def N(self, commit=True) -> None:
-        self.__a.off(commit=False)
-        self.__b.off(commit=False)
-        self.__c.on(commit=False)
-        self.__d.off(commit=False)
-        self.__e.on(commit=False)
-        self.__f.off(commit=False)
-        self.__g.on(commit=False)
-        self.__dot.off(commit=False)
-        if commit:
-            self.commit()
+        self.show(GLYPHS['N'], commit)
 
     def O(self, uppercase=True, commit=True) -> None:
-        if uppercase:
-            self.__a.on(commit=False)
-            self.__b.on(commit=False)
-            self.__c.on(commit=False)
-            self.__d.on(commit=False)
-            self.__e.on(commit=False)
-            self.__f.on(commit=False)
-            self.__g.off(commit=False)
-            self.__dot.off(commit=False)
-        else:
-            self.__a.off(commit=False)
-            self.__b.off(commit=False)
-            self.__c.on(commit=False)
-            self.__d.on(commit=False)
-            self.__e.on(commit=False)
-            self.__f.off(commit=False)
-            self.__g.on(commit=False)
-            self.__dot.off(commit=False)
-        if commit:
-            self.commit()
+        self.show(GLYPHS['O'] if uppercase else GLYPHS['o'], commit)
 
     def P(self, commit=True) -> None:
-        self.__a.on(commit=False)
-        self.__b.on(commit=False)
-        self.__c.off(commit=False)
-        self.__d.off(commit=False)
-        self.__e.on(commit=False)
-        self.__f.on(commit=False)
-        self.__g.on(commit=False)
-        self.__dot.off(commit=False)
-        if commit:
-            self.commit()
+        self.show(GLYPHS['P'], commit)
 
     def Q(self, commit=True) -> None:
-        self.__a.on(commit=False)
-        self.__b.on(commit=False)
-        self.__c.on(commit=False)
-        self.__d.off(commit=False)
-        self.__e.off(commit=False)
-        self.__f.on(commit=False)
-        self.__g.on(commit=False)
-        self.__dot.off(commit=False)
-        if commit:
-            self.commit()
+        self.show(GLYPHS['Q'], commit)
 
     def R(self, commit=True) -> None:
-        self.__a.off(commit=False)
-        self.__b.off(commit=False)
-        self.__c.off(commit=False)
-        self.__d.off(commit=False)
-        self.__e.on(commit=False)
-        self.__f.off(commit=False)
-        self.__g.on(commit=False)
-        self.__dot.off(commit=False)
-        if commit:
-            self.commit()
+        self.show(GLYPHS['R'], commit)
 
     def S(self, commit=True) -> None:
-        self.__a.on(commit=False)
-        self.__b.off(commit=False)
-        self.__c.on(commit=False)
-        self.__d.on(commit=False)
-        self.__e.off(commit=False)
-        self.__f.on(commit=False)
-        self.__g.on(commit=False)
-        self.__dot.off(commit=False)
-        if commit:
-            self.commit()
+        self.show(GLYPHS['S'], commit)
 
     def T(self, commit=True) -> None:
-        self.__a.off(commit=False)
-        self.__b.off(commit=False)
-        self.__c.off(commit=False)
-        self.__d.on(commit=False)
-        self.__e.on(commit=False)
-        self.__f.on(commit=False)
-        self.__g.on(commit=False)
-        self.__dot.off(commit=False)
-        if commit:
-            self.commit()
+        self.show(GLYPHS['T'], commit)
 
     def U(self, uppercase=True, commit=True) -> None:
-        if uppercase:
-            self.__a.off(commit=False)
-            self.__b.on(commit=False)
-            self.__c.on(commit=False)
-            self.__d.on(commit=False)
-            self.__e.on(commit=False)
-            self.__f.on(commit=False)
-            self.__g.off(commit=False)
-            self.__dot.off(commit=False)
-        else:
-            self.__a.off(commit=False)
-            self.__b.off(commit=False)
-            self.__c.on(commit=False)
-            self.__d.on(commit=False)
-            self.__e.on(commit=False)
-            self.__f.off(commit=False)
-            self.__g.off(commit=False)
-            self.__dot.off(commit=False)
-        if commit:
-            self.commit()
+        self.show(GLYPHS['U'] if uppercase else GLYPHS['u'], commit)
 
     def Y(self, commit=True) -> None:
-        self.__a.off(commit=False)
-        self.__b.on(commit=False)
-        self.__c.on(commit=False)
-        self.__d.on(commit=False)
-        self.__e.off(commit=False)
-        self.__f.on(commit=False)
-        self.__g.on(commit=False)
-        self.__dot.off(commit=False)
-        if commit:
-            self.commit()
+        self.show(GLYPHS['Y'], commit)
 
     def Z(self, commit=True) -> None:
-        self.__a.on(commit=False)
-        self.__b.on(commit=False)
-        self.__c.off(commit=False)
-        self.__d.on(commit=False)
-        self.__e.on(commit=False)
-        self.__f.off(commit=False)
-        self.__g.on(commit=False)
-        self.__dot.off(commit=False)
-        if commit:
-            self.commit()
+        self.show(GLYPHS['Z'], commit)
 
     def set_value(self, value: int, commit=True) -> None:
-        if value == 0:
-            self.zero(commit=commit)
-        elif value == 1:
-            self.one(commit=commit)
-        elif value == 2:
-            self.two(commit=commit)
-        elif value == 3:
-            self.three(commit=commit)
-        elif value == 4:
-            self.four(commit=commit)
-        elif value == 5:
-            self.five(commit=commit)
-        elif value == 6:
-            self.six(commit=commit)
-        elif value == 7:
-            self.seven(commit=commit)
-        elif value == 8:
-            self.eight(commit=commit)
-        elif value == 9:
-            self.nine(commit=commit)
\ No newline at end of file
+        if 0 <= value <= 9:
+            self.show(DIGITS[value], commit)
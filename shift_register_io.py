@@ -0,0 +1,35 @@
+from serial_to_parallel import SerialToParallel
+from parallel_to_serial import ParallelToSerial
+
+import machine
+
+
+class ShiftRegisterIO:
+
+    def __init__(self, spi: machine.SPI, outputs: SerialToParallel, inputs: ParallelToSerial):
+        # outputs and inputs are built on this spi: MOSI to DS of the 74HC595 chain, MISO to QH of the 74HC165
+        # chain, SCK to both clocks. mode 0 suits the 595, the 165 output changes after the rising edge it is
+        # sampled on
+        if inputs.ic_count > outputs.ic_count:
+            raise ValueError('the 74HC165 chain can not be longer than the 74HC595 chain')
+        self.__spi = spi
+        self.__spi.init(polarity=0, phase=0, firstbit=machine.SPI.LSB)
+        self.__outputs = outputs
+        self.__inputs = inputs
+        self.__readback = bytearray(outputs.ic_count)
+
+    @property
+    def outputs(self) -> SerialToParallel:
+        return self.__outputs
+
+    @property
+    def inputs(self) -> ParallelToSerial:
+        return self.__inputs
+
+    def cycle(self) -> int:
+        # loads the inputs, shifts new outputs out while the inputs shift in, then latches the outputs. the inputs
+        # are only fed when the exchange captured them, a busy bus reports no change
+        self.__inputs.load()
+        if not self.__outputs.exchange(self.__readback):
+            return 0
+        return self.__inputs.feed(self.__readback)
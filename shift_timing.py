@@ -0,0 +1,53 @@
+import math
+
+# worst of 74HC595 and 74HC165 at 25 C: (vcc, minimum clock/latch pulse width in ns, maximum clock frequency in Hz)
+DATASHEET_LIMITS = ((2.0, 80, 6000000), (4.5, 16, 30000000), (6.0, 14, 35000000))
+
+
+class ShiftTiming:
+
+    def __init__(self, name: str, clock_us: int = 0, latch_us: int = 0, baudrate: int = 1000000):
+        self.__name = name
+        self.__clock_us = clock_us
+        self.__latch_us = latch_us
+        self.__baudrate = baudrate
+
+    @staticmethod
+    def zero_delay():
+        return ShiftTiming('zero delay', clock_us=0, latch_us=0, baudrate=20000000)
+
+    @staticmethod
+    def datasheet(vcc: float = 3.3):
+        if vcc < DATASHEET_LIMITS[0][0]:
+            raise ValueError('74HC595/74HC165 are not specified below ' + str(DATASHEET_LIMITS[0][0]) + 'V')
+        pulse_ns, max_frequency = DATASHEET_LIMITS[0][1], DATASHEET_LIMITS[0][2]
+        for limit_vcc, limit_pulse_ns, limit_frequency in DATASHEET_LIMITS:
+            if vcc >= limit_vcc:
+                pulse_ns, max_frequency = limit_pulse_ns, limit_frequency
+        pulse_us = int(math.ceil(pulse_ns / 1000.0))
+        return ShiftTiming('datasheet ' + str(vcc) + 'V', clock_us=pulse_us, latch_us=pulse_us,
+                           baudrate=max_frequency)
+
+    @staticmethod
+    def long_cable():
+        return ShiftTiming('long cable', clock_us=10, latch_us=20, baudrate=100000)
+
+    @staticmethod
+    def profiles(vcc: float = 3.3) -> list:
+        return [ShiftTiming.zero_delay(), ShiftTiming.datasheet(vcc), ShiftTiming.long_cable()]
+
+    @property
+    def name(self) -> str:
+        return self.__name
+
+    @property
+    def clock_us(self) -> int:
+        return self.__clock_us
+
+    @property
+    def latch_us(self) -> int:
+        return self.__latch_us
+
+    @property
+    def baudrate(self) -> int:
+        return self.__baudrate
@@ -1,4 +1,5 @@
-from machine import Pin, PWM, Timer, UART
+from machine import Pin, Timer, UART
+from pwm_pool import PwmPool
 import time
 
 
@@ -54,7 +55,7 @@ def pulse_to_move(stepper_motors, pulses, time_deviation, timer=0):
 
 class StepperMotor:
     def __init__(self, dir_pin_index, ena_pin_index, pul_pin_index, pulse_per_revolution=3200, gearbox_ratio=1,
-                 timer=0):
+                 timer=0, pwm_pool=None):
         self.dir = Pin(dir_pin_index, Pin.OUT)
         self.dir.off()
         self.ena = Pin(ena_pin_index, Pin.OUT)
@@ -67,6 +68,7 @@ class StepperMotor:
         self._speed = 25
         self.pul_pwm = None
         self.timer = Timer(timer)
+        self.pwm_pool = pwm_pool if pwm_pool is not None else PwmPool.default()
 
     def enable(self):
         self.ena.off()
@@ -139,11 +141,16 @@ class StepperMotor:
         self.set_speed_steps_per_second(steps_per_second)
 
     def continues_moving(self):
-        self.pul_pwm = PWM(self.pul, freq=int(500000.0 / self._speed), duty_u16=32768)
+        frequency = int(500000.0 / self._speed)
+        if self.pul_pwm is not None:
+            # already moving, only the speed changes
+            self.pwm_pool.set_frequency([self._pul_index], frequency)
+            return
+        self.pul_pwm = self.pwm_pool.allocate(self._pul_index, frequency, 512)
 
     def stop_continues_moving(self):
-        self.pul_pwm.deinit()
-        del self.pul_pwm
+        self.pwm_pool.release(self._pul_index)
+        self.pul_pwm = None
         self.pul = Pin(self._pul_index, Pin.OUT)
         self.pul.off()
 
@@ -0,0 +1,51 @@
+import machine
+
+
+class TickScheduler:
+
+    def __init__(self, timer: machine.Timer, tick_ms: int = 10):
+        # one periodic timer steps every engine that still has work, it is stopped while none has
+        self.__timer = timer
+        self.__tick_ms = tick_ms
+        self.__clients = []
+        self.__running = False
+
+    @property
+    def tick_ms(self) -> int:
+        return self.__tick_ms
+
+    @property
+    def running(self) -> bool:
+        return self.__running
+
+    def add(self, client) -> None:
+        # client.step(elapsed_ms) is called every tick until it returns False
+        if client not in self.__clients:
+            self.__clients.append(client)
+        if not self.__running:
+            self.__running = True
+            self.__timer.init(period=self.__tick_ms, mode=machine.Timer.PERIODIC, callback=lambda t: self.tick())
+
+    def remove(self, client) -> None:
+        if client in self.__clients:
+            self.__clients.remove(client)
+        if not self.__clients:
+            self.__halt()
+
+    def __halt(self) -> None:
+        if self.__running:
+            self.__running = False
+            self.__timer.deinit()
+
+    def tick(self) -> None:
+        finished = None
+        for client in self.__clients:
+            if not client.step(self.__tick_ms):
+                if finished is None:
+                    finished = []
+                finished.append(client)
+        if finished is not None:
+            for client in finished:
+                self.__clients.remove(client)
+            if not self.__clients:
+                self.__halt()